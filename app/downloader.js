@@ -48,10 +48,30 @@ document.addEventListener('keydown', (event) => {
     }
 });
 
+// Playlist / album links are imported as a whole instead of searched
+const PLAYLIST_URL_RE = /^https?:\/\/.*([?&]list=|\/playlist|\/album\/|\/browse\/)/i;
+
+async function importPlaylist(url) {
+    const useSpotify = document.getElementById('dl-spotify').checked;
+    const status = document.getElementById('dl-status');
+    document.getElementById('dl-results').innerHTML = "";
+    document.getElementById('dl-step-2').style.display = 'none';
+    status.innerText = "Reading playlist...";
+
+    const res = await callApi('import_playlist', url, useSpotify);
+    if (!res || res.status !== 'success') {
+        status.innerText = "❌ Import failed: " + ((res && res.message) || "unknown error");
+        return;
+    }
+    const skipped = res.skipped.length ? ` (${res.skipped.length} already in library)` : "";
+    status.innerText = `Importing ${res.queued} of ${res.total} tracks${res.title ? ' from ' + res.title : ''}${skipped}`;
+}
+
 // STEP 1: SEARCH YT MUSIC (Using callApi)
 async function searchYT() {
     const query = document.getElementById('dl-input').value;
     if(!query) return;
+    if (PLAYLIST_URL_RE.test(query.trim())) return importPlaylist(query.trim());
 
     const status = document.getElementById('dl-status');
     const resultsDiv = document.getElementById('dl-results');
@@ -99,21 +119,67 @@ function selectForDownload(item) {
     document.getElementById('start-dl-btn').onclick = startDownload;
 }
 
-// STEP 2: DOWNLOAD (Using callApi)
+// STEP 2: DOWNLOAD (queued in the backend, several jobs can run at once)
 async function startDownload() {
     const useSpotify = document.getElementById('dl-spotify').checked;
     const status = document.getElementById('dl-status');
-    
-    status.innerText = "Downloading and converting... please wait";
     document.getElementById('dl-step-2').style.display = 'none';
 
-    const response = await callApi('download_track', selectedYTItem.url, useSpotify);
-
-    if(response && response.status === "success") {
-        status.innerText = "🔥 " + (response.filename || "Download finished!");
-        const newFiles = await callApi('scan_folder');
-        if(newFiles && Array.isArray(newFiles)) renderPlaylist(newFiles);
+    const job = await callApi('enqueue_download', selectedYTItem.url, useSpotify, selectedYTItem.title);
+    if (job && job.id) {
+        status.innerText = "Queued: " + selectedYTItem.title;
+        updateDownloadJob(job);
     } else {
-        status.innerText = "❌ Download failed. Please try a different song.";
+        status.innerText = "❌ Could not queue the download.";
     }
-}
\ No newline at end of file
+}
+
+// --- DOWNLOAD JOBS (pushed by the backend via updateDownloadJob) ---
+const downloadJobs = new Map();
+const DL_STATE_LABELS = {
+    queued: "Queued", downloading: "", processing: "Converting",
+    done: "🔥 Done", error: "❌ Failed", cancelled: "Cancelled"
+};
+
+function updateDownloadJob(job) {
+    const prev = downloadJobs.get(job.id);
+    downloadJobs.set(job.id, job);
+    renderDownloadJob(job);
+    if (prev && prev.status !== job.status) {
+        const status = document.getElementById('dl-status');
+        if (job.status === 'done') status.innerText = "🔥 " + (job.filename || "Download finished!");
+        else if (job.status === 'error') status.innerText = "❌ Download failed. Please try a different song.";
+    }
+}
+
+function renderDownloadJob(job) {
+    const list = document.getElementById('dl-jobs');
+    if (!list) return;
+    let row = document.getElementById('dl-job-' + job.id);
+    if (!row) {
+        row = document.createElement('div');
+        row.className = 'dl-job';
+        row.id = 'dl-job-' + job.id;
+        row.innerHTML = `
+            <div class="dl-job-info">
+                <div class="dl-job-title"></div>
+                <div class="dl-job-bar"><div></div></div>
+            </div>
+            <div class="dl-job-state"></div>
+            <span class="dl-job-cancel" title="Cancel">✕</span>`;
+        row.querySelector('.dl-job-cancel').onclick = () => callApi('cancel_download', job.id);
+        list.prepend(row);
+    }
+    row.querySelector('.dl-job-title').innerText = job.title || job.url;
+    row.querySelector('.dl-job-title').title = job.message || '';
+    row.querySelector('.dl-job-bar div').style.width = (job.progress || 0) + '%';
+    row.querySelector('.dl-job-state').innerText =
+        job.status === 'downloading' ? (job.progress || 0) + '%' : DL_STATE_LABELS[job.status] || job.status;
+    row.querySelector('.dl-job-cancel').style.visibility =
+        (job.status === 'queued' || job.status === 'downloading') ? 'visible' : 'hidden';
+}
+
+window.addEventListener('pywebviewready', async () => {
+    const jobs = await callApi('get_download_jobs');
+    if (Array.isArray(jobs)) jobs.forEach(updateDownloadJob);
+});
\ No newline at end of file
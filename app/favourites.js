@@ -23,15 +23,8 @@ async function createNewFavourite() {
     const name = document.getElementById('fav-name-input').value;
     if (!name) return alert("Please enter a name");
 
-    const newFav = {
-        id: Date.now(),
-        name: name,
-        image: currentFavImage || 'alt.png',
-        tracks: []
-    };
-
+    const newFav = await window.pywebview.api.create_favourite(name, currentFavImage || 'alt.png');
     favourites.push(newFav);
-    await window.pywebview.api.save_favourites_list(favourites);
 
     renderFavouritesSidebar();
     closeFavModal();
@@ -72,7 +65,7 @@ function showFavContextMenu(event, favId) {
         const newName = prompt("New name:", fav.name);
         if (newName && newName.trim()) {
             fav.name = newName.trim();
-            await window.pywebview.api.save_favourites_list(favourites);
+            await window.pywebview.api.rename_favourite(favId, fav.name);
             renderFavouritesSidebar();
         }
         menu.remove();
@@ -86,7 +79,7 @@ function showFavContextMenu(event, favId) {
     deleteItem.onclick = async () => {
         if (confirm("Delete this playlist?")) {
             favourites = favourites.filter(f => f.id !== favId);
-            await window.pywebview.api.save_favourites_list(favourites);
+            await window.pywebview.api.delete_favourite(favId);
             renderFavouritesSidebar();
             if (isViewingFavourite) backToLocalFiles();
         }
@@ -102,10 +95,10 @@ function showFavContextMenu(event, favId) {
     }, 100);
 }
 
-function getLikedSongs() {
+async function getLikedSongs() {
     let liked = favourites.find(f => f.name === 'Liked Songs');
     if (!liked) {
-        liked = { id: Date.now(), name: 'Liked Songs', image: 'alt.png', tracks: [] };
+        liked = await window.pywebview.api.create_favourite('Liked Songs', 'alt.png');
         favourites.push(liked);
     }
     return liked;
@@ -134,14 +127,18 @@ function updateLikeBtn() {
     btn.classList.toggle('liked', isLiked);
 }
 
-function toggleLikeCurrent() {
+async function toggleLikeCurrent() {
     const path = currentFilePath();
     if (!path) return;
-    const liked = getLikedSongs();
+    const liked = await getLikedSongs();
     const idx = liked.tracks.indexOf(path);
-    if (idx >= 0) liked.tracks.splice(idx, 1);
-    else liked.tracks.push(path);
-    window.pywebview.api.save_favourites_list(favourites);
+    if (idx >= 0) {
+        liked.tracks.splice(idx, 1);
+        window.pywebview.api.remove_track_from_favourite(liked.id, path);
+    } else {
+        liked.tracks.push(path);
+        window.pywebview.api.add_track_to_favourite(liked.id, path);
+    }
     renderFavouritesSidebar();
     updateLikeBtn();
 }
@@ -168,7 +165,7 @@ function showFavSelector(event, trackPath) {
         item.onclick = async () => {
             if (!fav.tracks.includes(trackPath)) {
                 fav.tracks.push(trackPath);
-                await window.pywebview.api.save_favourites_list(favourites);
+                await window.pywebview.api.add_track_to_favourite(fav.id, trackPath);
                 renderFavouritesSidebar();
             }
             selector.remove();
@@ -222,8 +219,10 @@ function renderFavouriteTracks(tracks, favId) {
         const coverSrc = f.cover && f.cover !== "" ? f.cover : 'alt.png';
         const escapedPath = f.path.replace(/\\/g, '\\\\');
         return `
-        <div class="playlist-item" id="favitem-${i}" onclick="selectFavTrack(${i})">
-            <img class="pl-cover-mini" src="${coverSrc}" onerror="this.src='alt.png'">
+        <div class="playlist-item" id="favitem-${i}" onclick="selectFavTrack(${i})" draggable="true"
+            ondragstart="favDragIndex = ${i}" ondragover="event.preventDefault()"
+            ondrop="event.preventDefault(); moveFavTrack(${favId}, ${i})">
+            <img class="pl-cover-mini" src="${coverSrc}" loading="lazy" onerror="this.src='alt.png'">
             <div class="pl-text-container">
                 <div class="pl-title">${f.name || f.filename}</div>
                 <div class="pl-artist">${f.artist || 'Unknown Artist'}</div>
@@ -242,11 +241,27 @@ async function removeTrackFromFav(favId, trackPath, localIndex) {
     const fav = favourites.find(f => f.id === favId);
     if (!fav) return;
     fav.tracks = fav.tracks.filter(p => p !== trackPath);
-    await window.pywebview.api.save_favourites_list(favourites);
+    await window.pywebview.api.remove_track_from_favourite(favId, trackPath);
     renderFavouritesSidebar();
     viewFavourite(favId);
 }
 
+// Drag & Drop innerhalb einer Favoriten-Playlist
+let favDragIndex = null;
+
+async function moveFavTrack(favId, toIndex) {
+    const fav = favourites.find(f => f.id === favId);
+    const from = favDragIndex;
+    favDragIndex = null;
+    if (!fav || from === null || from === toIndex) return;
+    const [path] = fav.tracks.splice(from, 1);
+    fav.tracks.splice(toIndex, 0, path);
+    const [track] = currentFavTracks.splice(from, 1);
+    currentFavTracks.splice(toIndex, 0, track);
+    renderFavouriteTracks(currentFavTracks, favId);
+    await window.pywebview.api.move_favourite_track(favId, path, toIndex);
+}
+
 async function backToLocalFiles() {
     isViewingFavourite = false;
     currentFavTracks = [];
@@ -254,8 +269,6 @@ async function backToLocalFiles() {
     document.getElementById('title').innerText = "Ready for INFERNO?";
     document.getElementById('details').innerText = "Select a track from your playlist";
 
-    setPlaylistLoading(true);
-    const files = await window.pywebview.api.scan_folder();
-    if (files) renderPlaylist(files);
-    setPlaylistLoading(false);
+    // The library stays loaded (and watched) while a favourite is open, so just redraw it
+    refreshPlaylistView();
 }
@@ -79,6 +79,7 @@ function handleScrub(e) {
     const pct = offsetX / rect.width;
     current.currentTime = pct * current.duration;
     progressFill.style.width = (pct * 100) + "%";
+    if (typeof drawWaveform === 'function') drawWaveform(pct);
     document.getElementById('t-cur').innerText = fmt(pct * current.duration);
 }
 
@@ -126,11 +127,12 @@ async function showInFolder(path) {
 function playMedia(meta) {
     currentMetadata = meta; // Speichere die Metadaten für Plugins
     if (typeof updateLikeBtn === 'function') updateLikeBtn();
+    if (typeof loadWaveform === 'function') loadWaveform(meta);
     
-    if (typeof isRadioMode !== 'undefined') isRadioMode = false;
-    if (typeof radioMetadataInterval !== 'undefined' && radioMetadataInterval) {
-        clearInterval(radioMetadataInterval);
-        radioMetadataInterval = null;
+    if (typeof isRadioMode !== 'undefined') {
+        if (isRadioMode) callApi('stop_radio_monitor');
+        isRadioMode = false;
+        currentRadioUrl = null;
     }
 
     if (!audioCtx) {
@@ -276,6 +278,7 @@ function playTrackByPath(path) {
             if (dur > 0) {
                 const p = (cur / dur) * 100;
                 progressFill.style.width = p + "%";
+                if (typeof drawWaveform === 'function') drawWaveform(cur / dur);
                 document.getElementById('t-dur').innerText = fmt(dur);
             }
         }
@@ -303,13 +306,7 @@ function randomSong() {
 async function selectTrack(i) {
     if (i < 0 || i >= playlist.length) return;
     index = i;
-    
-    document.querySelectorAll('.playlist-item').forEach(el => el.classList.remove('active'));
-    const activeEl = document.getElementById(`item-${i}`);
-    if (activeEl) {
-        activeEl.classList.add('active');
-        activeEl.scrollIntoView({ behavior: 'smooth', block: 'center' });
-    }
+    revealPlaylistItem(i);
     
     const meta = await callApi('get_metadata', playlist[index].path);
     playMedia(meta);
@@ -1,6 +1,22 @@
 let filteredPlaylist = [];
 let currentFavTracks = [];
 
+// --- VIRTUAL LIST ---
+// Only the rows inside the visible window exist in the DOM, the rest is spacer height.
+const PLAYLIST_OVERSCAN = 8;
+let playlistRowHeight = 62; // .playlist-item: 42px cover + 16px padding + 4px margin, measured on first render
+let viewIndices = null;     // null = whole playlist, otherwise global indices matching the search
+let renderQueued = false;
+
+// --- SEARCH ---
+const SEARCH_LIMIT = 1000;
+let searchSeq = 0;
+let pathIndex = null;       // Map path -> global index, rebuilt lazily after the playlist changed
+
+// --- PROGRESSIVE SCAN ---
+let libraryScanToken = 0;
+let startupReported = false;
+
 function setPlaylistLoading(isLoading) {
     const loader = document.getElementById('playlist-loader');
     const sidebar = document.getElementById('sidebar');
@@ -20,33 +36,98 @@ function getActivePlaylist() {
 }
 
 function refreshPlaylist() {
+    startLibraryScan();
+}
+
+window.addEventListener('pywebviewready', () => {
+    document.getElementById('playlist').addEventListener('scroll', schedulePlaylistRender);
+    window.addEventListener('resize', schedulePlaylistRender);
+    loadLibrary();
+});
+
+// At launch the last snapshot is listed right away; the scan afterwards only sends differences
+async function loadLibrary() {
+    libraryScanToken++;
+    const token = libraryScanToken;
     setPlaylistLoading(true);
-    callApi('scan_folder').then(files => {
-        if (files) {
-            renderPlaylist(files);
-            applySearchFilter(document.getElementById('search-input').value);
-        }
+    const snap = await callApi('get_library_snapshot').catch(() => null);
+    if (token !== libraryScanToken) return;
+    if (snap && snap.items.length) {
+        playlist = snap.items;
+        pathIndex = null;
         setPlaylistLoading(false);
-    });
+        refreshPlaylistView();
+        reportFirstTrack();
+    }
+    callApi('start_library_scan', token, null, !!(snap && snap.cached));
 }
 
-window.addEventListener('pywebviewready', async () => {
+// Startup budget: process start -> first playable track listed (measured in the backend)
+function reportFirstTrack() {
+    if (startupReported || !playlist.length) return;
+    startupReported = true;
+    requestAnimationFrame(() => callApi('report_startup', 'first_track').catch(() => {}));
+}
+
+function startLibraryScan() {
+    libraryScanToken++;
+    playlist = [];
+    pathIndex = null;
     setPlaylistLoading(true);
-    const files = await callApi('scan_folder');
-    if (files) renderPlaylist(files);
+    callApi('start_library_scan', libraryScanToken);
+}
+
+function compareTracks(a, b) {
+    const an = a.name || '', bn = b.name || '';
+    return an < bn ? -1 : an > bn ? 1 : 0;
+}
+
+// Batches arrive from the backend while the scan is still running
+function appendLibraryBatch(token, items) {
+    if (token !== libraryScanToken || !items.length) return;
+    const incoming = new Set(items.map(f => f.path));
+    let base = playlist;
+    if (base.some(t => incoming.has(t.path))) base = base.filter(t => !incoming.has(t.path));
+    const batch = items.slice().sort(compareTracks);
+
+    // Merge two sorted lists instead of re-sorting the whole library per batch
+    const merged = new Array(base.length + batch.length);
+    let i = 0, j = 0, k = 0;
+    while (i < base.length && j < batch.length) merged[k++] = compareTracks(base[i], batch[j]) <= 0 ? base[i++] : batch[j++];
+    while (i < base.length) merged[k++] = base[i++];
+    while (j < batch.length) merged[k++] = batch[j++];
+    playlist = merged;
+    pathIndex = null;
+
     setPlaylistLoading(false);
-});
+    refreshPlaylistView();
+    reportFirstTrack();
+}
 
-function renderPlaylist(files) {
-    playlist = files;
-    filteredPlaylist = [];
-    const container = document.getElementById('playlist');
-    container.innerHTML = playlist.map((f, i) => {
-        const coverSrc = f.cover && f.cover !== "" ? f.cover : 'alt.png';
-        const escapedPath = f.path.replace(/\\/g, '\\\\');
-        return `
-        <div class="playlist-item" id="item-${i}" onclick="selectTrack(${i})" oncontextmenu="showPlaylistContextMenu(event, ${i})">
-            <img class="pl-cover-mini" src="${coverSrc}" onerror="this.src='alt.png'">
+function finishLibraryScan(token, removedPaths) {
+    if (token !== libraryScanToken) return;
+    if (removedPaths && removedPaths.length) {
+        const removed = new Set(removedPaths);
+        playlist = playlist.filter(t => !removed.has(t.path));
+        pathIndex = null;
+    }
+    setPlaylistLoading(false);
+    refreshPlaylistView();
+}
+
+function refreshPlaylistView() {
+    const activePath = currentFilePath();
+    if (activePath) index = playlist.findIndex(t => t.path === activePath);
+    applySearchFilter(document.getElementById('search-input').value);
+}
+
+function playlistItemHTML(f, i) {
+    const coverSrc = f.cover && f.cover !== "" ? f.cover : 'alt.png';
+    const escapedPath = f.path.replace(/\\/g, '\\\\');
+    const active = i === index ? ' active' : '';
+    return `
+        <div class="playlist-item${active}" id="item-${i}" data-index="${i}" onclick="selectTrack(+this.dataset.index)" oncontextmenu="showPlaylistContextMenu(event, +this.dataset.index)">
+            <img class="pl-cover-mini" src="${coverSrc}" loading="lazy" onerror="this.src='alt.png'">
             <div class="pl-text-container">
                 <div class="pl-title">${f.name || f.filename}</div>
                 <div class="pl-artist">${f.artist || 'Unknown Artist'}</div>
@@ -56,22 +137,117 @@ function renderPlaylist(files) {
             </svg>
         </div>
         `;
-    }).join('');
 }
 
+function renderPlaylist(files) {
+    playlist = files;
+    pathIndex = null;
+    libraryScanToken++;
+    setPlaylistLoading(false);
+    refreshPlaylistView();
+}
+
+function schedulePlaylistRender() {
+    if (renderQueued) return;
+    renderQueued = true;
+    requestAnimationFrame(() => {
+        renderQueued = false;
+        renderVisibleRows();
+    });
+}
+
+function renderVisibleRows() {
+    if (typeof isViewingFavourite !== 'undefined' && isViewingFavourite) return;
+    const container = document.getElementById('playlist');
+    const count = viewIndices ? viewIndices.length : playlist.length;
+    const first = Math.max(0, Math.floor(container.scrollTop / playlistRowHeight) - PLAYLIST_OVERSCAN);
+    const visible = Math.ceil(container.clientHeight / playlistRowHeight) + 2 * PLAYLIST_OVERSCAN;
+    const last = Math.min(count, first + visible);
+
+    let rows = '';
+    for (let k = first; k < last; k++) {
+        const i = viewIndices ? viewIndices[k] : k;
+        rows += playlistItemHTML(playlist[i], i);
+    }
+    container.innerHTML =
+        `<div style="height:${first * playlistRowHeight}px"></div>` +
+        rows +
+        `<div style="height:${(count - last) * playlistRowHeight}px"></div>`;
+
+    const row = container.querySelector('.playlist-item');
+    if (row) {
+        const h = row.getBoundingClientRect().height + parseFloat(getComputedStyle(row).marginBottom || 0);
+        if (h > 0 && Math.abs(h - playlistRowHeight) > 0.5) {
+            playlistRowHeight = h;
+            schedulePlaylistRender();
+        }
+    }
+}
+
+// Scrolls the virtual list so that the track with the given global index is visible
+function revealPlaylistItem(i) {
+    if (typeof isViewingFavourite !== 'undefined' && isViewingFavourite) return;
+    const container = document.getElementById('playlist');
+    const k = viewIndices ? viewIndices.indexOf(i) : i;
+    if (k < 0) { renderVisibleRows(); return; }
+    const top = k * playlistRowHeight;
+    if (top < container.scrollTop || top + playlistRowHeight > container.scrollTop + container.clientHeight) {
+        container.scrollTop = Math.max(0, top - container.clientHeight / 2);
+    }
+    renderVisibleRows();
+}
+
+// Called by the folder watcher with only the tracks that changed on disk
+function applyLibraryDelta(delta) {
+    const activePath = playlist[index] ? playlist[index].path : null;
+
+    // Modified tracks are removed and re-inserted, their title may have moved them
+    const removed = new Set(delta.removed || []);
+    // Added paths are also dropped first, so a track reported twice is never listed twice
+    [...(delta.added || []), ...(delta.modified || [])].forEach(f => removed.add(f.path));
+    if (removed.size > 0) playlist = playlist.filter(t => !removed.has(t.path));
+
+    [...(delta.added || []), ...(delta.modified || [])].forEach(f => {
+        let pos = playlist.findIndex(t => compareTracks(t, f) > 0);
+        if (pos < 0) pos = playlist.length;
+        playlist.splice(pos, 0, f);
+    });
+
+    pathIndex = null;
+    index = activePath ? playlist.findIndex(t => t.path === activePath) : -1;
+    applySearchFilter(document.getElementById('search-input').value);
+}
+
+function getPathIndex() {
+    if (!pathIndex) {
+        pathIndex = new Map();
+        playlist.forEach((f, i) => pathIndex.set(f.path, i));
+    }
+    return pathIndex;
+}
+
+// Search runs on the backend index; only the ranked matches are rendered
 function applySearchFilter(term) {
-    const t = term.toLowerCase().trim();
-    filteredPlaylist = [];
+    const t = term.trim();
+    const seq = ++searchSeq;
     if (!t) {
-        document.querySelectorAll('.playlist-item').forEach(item => item.style.display = "flex");
+        filteredPlaylist = [];
+        viewIndices = null;
+        renderVisibleRows();
         return;
     }
-    document.querySelectorAll('.playlist-item').forEach((item, i) => {
-        const title = item.querySelector('.pl-title').innerText.toLowerCase();
-        const artist = item.querySelector('.pl-artist').innerText.toLowerCase();
-        const match = title.includes(t) || artist.includes(t);
-        item.style.display = match ? "flex" : "none";
-        if (match) filteredPlaylist.push(playlist[i]);
+    callApi('search_library', t, SEARCH_LIMIT).then(results => {
+        if (seq !== searchSeq || !Array.isArray(results)) return;
+        const lookup = getPathIndex();
+        filteredPlaylist = [];
+        viewIndices = [];
+        results.forEach(f => {
+            const i = lookup.get(f.path);
+            if (i === undefined) return;
+            viewIndices.push(i);
+            filteredPlaylist.push(playlist[i]);
+        });
+        renderVisibleRows();
     });
 }
 
@@ -90,6 +266,7 @@ window.addEventListener('pywebviewready', () => {
     const searchInput = document.getElementById('search-input');
     if (searchInput) {
         searchInput.addEventListener('input', (e) => {
+            document.getElementById('playlist').scrollTop = 0;
             applySearchFilter(e.target.value);
         });
     }
@@ -1,5 +1,5 @@
 let radioList = [];
-let radioMetadataInterval = null;
+let currentRadioUrl = null;
 let isRadioMode = false;
 let isRadioExpanded = false;
 
@@ -143,12 +143,13 @@ async function save() {
 
 async function playRadio(url, stationName) {
     isRadioMode = true;
-    if (radioMetadataInterval) clearInterval(radioMetadataInterval);
+    currentRadioUrl = url;
 
     document.getElementById('title').innerText = "Connecting...";
     document.getElementById('details').innerText = stationName;
     document.getElementById('t-dur').innerText = "LIVE";
     document.getElementById('progress-fill').style.width = "100%";
+    if (typeof loadWaveform === 'function') loadWaveform(null);
 
     audio.pause();
     video.pause();
@@ -169,32 +170,25 @@ async function playRadio(url, stationName) {
             window.InfernoPluginAPI.trigger('onPlay', initialMeta);
         }
 
-        updateRadioInfo(url, stationName);
-        radioMetadataInterval = setInterval(() => updateRadioInfo(url, stationName), 15000);
+        // Titelwechsel werden vom Backend gemeldet (onRadioMetadata), kein Polling mehr
+        callApi('start_radio_monitor', url, stationName);
     } catch (e) {
         document.getElementById('title').innerText = "Stream Offline";
     }
 }
 
-async function updateRadioInfo(url, stationName) {
-    if (!isRadioMode) return;
-    try {
-        const data = await callApi('get_radio_metadata', url);
-        if (data) {
-            const currentSong = data.title || "Live Stream";
-            const currentStation = data.station || stationName;
-            document.getElementById('title').innerText = currentSong;
-            document.getElementById('details').innerText = currentStation;
-
-            const updatedMeta = { title: currentSong, artist: currentStation, isRadio: true, path: url };
-            if (window.InfernoPluginAPI) {
-                window.InfernoPluginAPI.setCurrentMetadata(updatedMeta);
-                window.InfernoPluginAPI.trigger('onTrackChange', updatedMeta);
-            }
-            await callApi('update_radio_discord', currentSong, currentStation);
-        }
-    } catch (e) {
-        console.error("Radio update failed:", e);
+function onRadioMetadata(data) {
+    // Wird vom RadioMonitor im Backend aufgerufen, sobald der Sender einen neuen Titel meldet
+    if (!isRadioMode || !data || data.url !== currentRadioUrl) return;
+    const currentSong = data.title || "Live Stream";
+    const currentStation = data.station;
+    document.getElementById('title').innerText = currentSong;
+    document.getElementById('details').innerText = currentStation;
+
+    const updatedMeta = { title: currentSong, artist: currentStation, isRadio: true, path: data.url };
+    if (window.InfernoPluginAPI) {
+        window.InfernoPluginAPI.setCurrentMetadata(updatedMeta);
+        window.InfernoPluginAPI.trigger('onTrackChange', updatedMeta);
     }
 }
 
@@ -0,0 +1,82 @@
+// --- WAVEFORM SEEK BAR ---
+// Die Peaks werden im Backend vorberechnet und vom Media-Server (/waveform) geliefert,
+// hier wird nur noch gezeichnet: pro Bin ein (min, max)-Paar als Uint8, 128 = Stille.
+let waveformPeaks = null;
+let waveformPath = null;
+let waveformPct = 0;
+
+function mediaOrigin(meta) {
+    try { return new URL(meta.path).origin; } catch { return null; }
+}
+
+function loadWaveform(meta) {
+    waveformPeaks = null;
+    waveformPath = null;
+    progressBar.classList.remove('has-waveform');
+    if (!meta || meta.isRadio) return;
+
+    const path = currentFilePath();
+    const origin = mediaOrigin(meta);
+    if (!path || !origin) return;
+    waveformPath = path;
+
+    // Aktueller Track zuerst, der nächste gleich hinterher
+    const list = getActivePlaylist();
+    const idx = list.findIndex(t => t.path === path);
+    const upcoming = idx >= 0 && list.length > 1 ? [list[(idx + 1) % list.length].path] : [];
+    callApi('request_waveforms', path, upcoming).catch(() => {});
+    fetchWaveform(origin, path);
+}
+
+async function fetchWaveform(origin, path) {
+    const res = await fetch(`${origin}/waveform?path=${encodeURIComponent(path)}`).catch(() => null);
+    // 202: wird noch berechnet, onWaveformReady meldet sich dann
+    if (!res || res.status !== 200) return;
+    const peaks = new Uint8Array(await res.arrayBuffer());
+    if (path !== waveformPath) return;
+    waveformPeaks = peaks;
+    progressBar.classList.add('has-waveform');
+    drawWaveform(waveformPct);
+}
+
+// Called from Python once the peaks of a requested track are cached
+function onWaveformReady(path) {
+    if (path !== waveformPath || waveformPeaks || !currentMetadata) return;
+    fetchWaveform(mediaOrigin(currentMetadata), path);
+}
+
+function drawWaveform(pct) {
+    waveformPct = pct;
+    if (!waveformPeaks) return;
+    const canvas = document.getElementById('waveform');
+    const dpr = window.devicePixelRatio || 1;
+    const w = canvas.clientWidth, h = canvas.clientHeight;
+    if (canvas.width !== Math.round(w * dpr) || canvas.height !== Math.round(h * dpr)) {
+        canvas.width = Math.round(w * dpr);
+        canvas.height = Math.round(h * dpr);
+    }
+    const ctx = canvas.getContext('2d');
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    ctx.clearRect(0, 0, w, h);
+
+    const bins = waveformPeaks.length / 2;
+    const split = Math.round(pct * w);
+    const played = new Path2D(), rest = new Path2D();
+    for (let x = 0; x < w; x++) {
+        // Alle Bins, die auf diesen Pixel fallen, zusammenfassen
+        const b0 = Math.floor(x * bins / w);
+        const b1 = Math.max(b0 + 1, Math.floor((x + 1) * bins / w));
+        let lo = 255, hi = 0;
+        for (let i = b0; i < b1 && i < bins; i++) {
+            lo = Math.min(lo, waveformPeaks[2 * i]);
+            hi = Math.max(hi, waveformPeaks[2 * i + 1]);
+        }
+        const y0 = (1 - hi / 255) * h, y1 = (1 - lo / 255) * h;
+        (x < split ? played : rest).rect(x, y0, 1, Math.max(1, y1 - y0));
+    }
+    const c = currentThemeColor;
+    ctx.fillStyle = `rgb(${c.r}, ${c.g}, ${c.b})`;
+    ctx.fill(played);
+    ctx.fillStyle = '#444';
+    ctx.fill(rest);
+}
@@ -0,0 +1,326 @@
+"""Benchmarks für die heißen Pfade des Players und der Discord-Bridge, Ergebnisse als JSON.
+
+Alles läuft gegen eine frisch erzeugte synthetische Bibliothek in einem Temp-Verzeichnis;
+library.db, Cover-Cache, Bild-Store usw. werden dafür auf dieses Verzeichnis umgebogen,
+die echte Bibliothek bleibt unberührt.
+
+    python benchmarks/run.py --tracks 1000 --out results.json
+    python benchmarks/run.py --compare results.json      # gegen einen älteren Lauf vergleichen
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthlib
+
+BENCHMARKS = ("scan", "metadata", "media", "bridge", "config")
+
+
+def summarize(samples_s):
+    """Latency summary in ms for a list of durations in seconds."""
+    ms = sorted(s * 1000 for s in samples_s)
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p50_ms": round(ms[len(ms) // 2], 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        "max_ms": round(ms[-1], 4),
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def isolate(main, workdir):
+    """Points every persistent store of main.py (and the cover resolver cache) at workdir.
+
+    Muss vor player.Api() laufen: Api liest config.json und der DownloadManager würde sonst
+    offene Jobs aus der echten downloads.json wieder starten und die Datei zurückschreiben."""
+    import cover_resolver
+    main.CONFIG_FILE = workdir / "config.json"
+    main.DOWNLOAD_JOBS_FILE = workdir / "downloads.json"
+    with cover_resolver.cover_cache._lock:
+        cover_resolver.cover_cache.db_path = workdir / "cover_cache.db"
+        cover_resolver.cover_cache._conn = None
+    main.library_index = main.LibraryIndex(workdir / "library.db")
+    main.search_index = main.SearchIndex(main.library_index)
+    main.cover_cache = main.CoverCache(workdir / "cache" / "covers", main.COVER_CACHE_MAX_BYTES)
+    main.image_store = main.ImageStore(workdir / "images")
+    main.waveform_service = main.WaveformService(workdir / "cache" / "waveforms")
+    main.library_snapshot = main.LibrarySnapshot(workdir / "library_snapshot.json")
+    main.station_registry = main.StationRegistry(workdir / "stations_config.json")
+    main.favourites_store = main.FavouritesStore(workdir / "favourites.json", workdir / "favourites.journal")
+    main.window = None
+
+
+# --- BENCHMARKS ---
+
+def bench_scan(main, api, lib_root):
+    """Api.scan_folder on an empty index (cold: every file through mutagen) and again unchanged (warm)."""
+    results = {}
+    for label in ("cold", "warm"):
+        t = time.perf_counter()
+        entries = api.scan_folder(str(lib_root))
+        seconds = time.perf_counter() - t
+        results[label] = {"files": len(entries), "seconds": round(seconds, 4),
+                          "files_per_s": round(len(entries) / seconds, 1) if seconds else None}
+    return results
+
+
+def bench_metadata(main, api, paths, repeat):
+    """Api.get_metadata (without Discord) for indexed tracks, as on every track change."""
+    rng = random.Random(2)
+    sample = [rng.choice(paths) for _ in range(repeat)]
+    it = iter(sample)
+    return summarize(timed(lambda: api.get_metadata(next(it), False), len(sample)))
+
+
+def bench_media(main, media_file, seeks, chunk=1024 * 1024):
+    """MediaHandler against a local server: full GET, 1 MiB range reads on one keep-alive
+    connection (like the <audio> element) and random seeks (64 KiB from a random offset)."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), main.MediaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    url = f"/media?path={urllib.parse.quote(str(media_file))}"
+    size = os.path.getsize(media_file)
+    results = {"file_mb": round(size / 1024 / 1024, 1)}
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+        t = time.perf_counter()
+        conn.request("GET", url)
+        resp = conn.getresponse()
+        received = 0
+        while True:
+            data = resp.read(256 * 1024)
+            if not data: break
+            received += len(data)
+        seconds = time.perf_counter() - t
+        results["full_get"] = {"seconds": round(seconds, 4), "mb_per_s": round(received / 1024 / 1024 / seconds, 1)}
+
+        t = time.perf_counter()
+        received = 0
+        for start in range(0, size, chunk):
+            conn.request("GET", url, headers={"Range": f"bytes={start}-{min(size, start + chunk) - 1}"})
+            resp = conn.getresponse()
+            received += len(resp.read())
+        seconds = time.perf_counter() - t
+        results["range_reads"] = {"chunk_kb": chunk // 1024, "seconds": round(seconds, 4),
+                                  "mb_per_s": round(received / 1024 / 1024 / seconds, 1)}
+
+        rng = random.Random(3)
+        samples = []
+        for _ in range(seeks):
+            start = rng.randrange(0, max(1, size - 65536))
+            t = time.perf_counter()
+            conn.request("GET", url, headers={"Range": f"bytes={start}-{start + 65535}"})
+            resp = conn.getresponse()
+            resp.read()
+            samples.append(time.perf_counter() - t)
+        results["seek"] = summarize(samples)
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def bench_bridge(frames):
+    """WSAudioSource.read per 20 ms frame, with the WebSocket side feeding one frame per read."""
+    try:
+        import discord_vc_bot as bot
+    except ImportError as e:
+        return {"skipped": f"discord_vc_bot not importable: {e}"}
+    source = bot.WSAudioSource()
+    frame = bytes(source.CHUNK_SIZE)
+    for _ in range(source.START_TARGET + 2):
+        source.feed(frame)
+    # die Statusmeldungen des Bots gehören nicht in die JSON-Ausgabe
+    with contextlib.redirect_stdout(sys.stderr):
+        source.read()
+    read_ns = 0
+    t_total = time.perf_counter_ns()
+    for _ in range(frames):
+        source.feed(frame)
+        t = time.perf_counter_ns()
+        source.read()
+        read_ns += time.perf_counter_ns() - t
+    total_ns = time.perf_counter_ns() - t_total
+    return {"frames": frames, "read_us_per_frame": round(read_ns / frames / 1000, 3),
+            "feed_read_us_per_frame": round(total_ns / frames / 1000, 3),
+            "silence_frames": source.stats["silence_frames"]}
+
+
+def bench_config(main, workdir, stations, playlists, tracks_per_playlist, repeat):
+    """Parse time of stations_config.json and favourites.json: cold (new registry/store, file is
+    read and parsed) and warm (in-memory view, as on every later load_stations/load_favourites)."""
+    rng = random.Random(4)
+    stations_file = workdir / "bench_stations.json"
+    fav_file = workdir / "bench_favourites.json"
+    with open(stations_file, 'w', encoding='utf-8') as f:
+        json.dump([{"name": f"Station {i}", "url": f"https://radio.example/{i}", "genre": "Bench",
+                    "image": f"https://img.example/{i}.png"} for i in range(stations)], f, indent=4)
+    with open(fav_file, 'w', encoding='utf-8') as f:
+        json.dump([{"id": 1000 + i, "name": f"Playlist {i}", "image": "alt.png",
+                    "tracks": [f"/music/{rng.randrange(10**6)}.mp3" for _ in range(tracks_per_playlist)]}
+                   for i in range(playlists)], f, indent=4)
+
+    registry = main.StationRegistry(stations_file)
+    store = main.FavouritesStore(fav_file, workdir / "bench_favourites.journal")
+    registry.all(); store.all()
+    return {
+        "load_stations": {
+            "stations": stations,
+            "cold": summarize(timed(lambda: main.StationRegistry(stations_file).all(), repeat)),
+            "warm": summarize(timed(registry.all, repeat)),
+        },
+        "load_favourites": {
+            "playlists": playlists, "tracks": playlists * tracks_per_playlist,
+            "cold": summarize(timed(
+                lambda: main.FavouritesStore(fav_file, workdir / "bench_favourites.journal").all(), repeat)),
+            "warm": summarize(timed(store.all, repeat)),
+        },
+    }
+
+
+# --- REPORT / COMPARE ---
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "-C", str(ROOT), "describe", "--always", "--dirty"],
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def flatten(data, prefix=""):
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def compare(old, new, threshold):
+    """Prints metrics that moved by more than threshold; returns the number of regressions."""
+    old_metrics = dict(flatten(old.get("results", {})))
+    regressions = 0
+    for name, value in flatten(new.get("results", {})):
+        metric = name.rsplit(".", 1)[-1]
+        if not metric.endswith(("_ms", "_s", "_us_per_frame", "seconds")) or name not in old_metrics: continue
+        before = old_metrics[name]
+        if not before: continue
+        change = (value - before) / before
+        higher_is_better = metric.endswith("per_s")
+        worse = change < -threshold if higher_is_better else change > threshold
+        better = change > threshold if higher_is_better else change < -threshold
+        if worse or better:
+            regressions += worse
+            print(f"{'REGRESSION' if worse else 'improved  '} {name}: {before} -> {value} ({change:+.0%})",
+                  file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="comma separated: " + ",".join(BENCHMARKS))
+    parser.add_argument("--tracks", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--cover-kb", type=int, default=64)
+    parser.add_argument("--video-ratio", type=float, default=0.1)
+    parser.add_argument("--engine", default="process", choices=("process", "thread"), help="scan engine")
+    parser.add_argument("--workers", type=int, default=0, help="scan workers (0 = auto)")
+    parser.add_argument("--media-mb", type=int, default=64, help="size of the streaming test file")
+    parser.add_argument("--seeks", type=int, default=200)
+    parser.add_argument("--frames", type=int, default=20000, help="frames for the bridge benchmark")
+    parser.add_argument("--repeat", type=int, default=50, help="repetitions for metadata/config timings")
+    parser.add_argument("--workdir", help="keep the generated library here instead of a temp dir")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change reported by --compare")
+    args = parser.parse_args(argv)
+    selected = [b.strip() for b in args.only.split(",") if b.strip()]
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="inferno-bench-")).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    import main as player
+    isolate(player, workdir)
+
+    lib_root = workdir / "library"
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "workdir")},
+        },
+        "results": {},
+    }
+    results = report["results"]
+    try:
+        paths = []
+        if {"scan", "metadata"} & set(selected):
+            t = time.perf_counter()
+            paths = synthlib.generate_library(lib_root, args.tracks, args.depth, cover_kb=args.cover_kb,
+                                              video_ratio=args.video_ratio)
+            report["meta"]["generate_seconds"] = round(time.perf_counter() - t, 2)
+        api = player.Api()
+        api._extractor = player.MetadataExtractor(args.engine, args.workers)
+
+        if "scan" in selected:
+            results["scan_folder"] = bench_scan(player, api, lib_root)
+        if "metadata" in selected:
+            if "scan" not in selected: api.scan_folder(str(lib_root))
+            results["get_metadata"] = bench_metadata(player, api, paths, args.repeat * 4)
+        if "media" in selected:
+            media_file = synthlib.write_media_file(workdir / "stream.mp3", args.media_mb)
+            results["media_server"] = bench_media(player, media_file, args.seeks)
+        if "bridge" in selected:
+            results["ws_audio_source"] = bench_bridge(args.frames)
+        if "config" in selected:
+            results.update(bench_config(player, workdir, 200, 50, 200, args.repeat))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Erzeugt offline eine synthetische Bibliothek aus getaggten MP3/MP4-Dateien für die Benchmarks.
+
+Die MP3s bestehen aus stummen MPEG-1 Layer III Frames (128 kbit/s, 44.1 kHz) mit ID3-Tags und
+optionalem APIC-Cover, die MP4s aus einem minimalen ftyp/moov/mdat-Gerüst mit iTunes-Tags.
+Beides liest mutagen wie echte Dateien; abspielbar muss nichts davon sein.
+
+    python benchmarks/synthlib.py OUT_DIR --tracks 1000 --depth 2 --cover-kb 64
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+from pathlib import Path
+
+from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB
+from mutagen.mp4 import MP4, MP4Cover
+
+# 128 kbit/s, 44.1 kHz, Stereo, ohne Padding -> 417 Bytes pro Frame, 1152 Samples
+MP3_FRAME = b'\xff\xfb\x90\x00' + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+WORDS = ("inferno", "ash", "ember", "night", "signal", "static", "velvet", "ghost", "neon", "river",
+         "glass", "echo", "storm", "lunar", "rust", "halo", "drift", "cinder", "pulse", "hollow")
+
+
+def _name(rng, words=2):
+    return " ".join(rng.choice(WORDS).capitalize() for _ in range(words))
+
+
+def _cover(rng, size):
+    """Opaque JPEG-like payload of the requested size (the player only passes cover bytes through)."""
+    if size <= 0: return None
+    return b'\xff\xd8\xff\xe0' + rng.randbytes(max(0, size - 6)) + b'\xff\xd9'
+
+
+def _box(kind, payload):
+    return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+
+def _mp4_skeleton(seconds):
+    mvhd = _box(b'mvhd', struct.pack('>B3xIIII', 0, 0, 0, 1000, int(seconds * 1000))
+                + struct.pack('>IH10x', 0x00010000, 0x0100)
+                + struct.pack('>9I', 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+                + bytes(24) + struct.pack('>I', 2))
+    return (_box(b'ftyp', b'isom' + struct.pack('>I', 512) + b'isomiso2mp41')
+            + _box(b'moov', mvhd) + _box(b'mdat', bytes(1024)))
+
+
+def write_mp3(path, seconds, title, artist, album, cover=None):
+    with open(path, 'wb') as f:
+        f.write(MP3_FRAME * max(1, int(seconds / MP3_FRAME_SECONDS)))
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text=title))
+    tags.add(TPE1(encoding=3, text=artist))
+    tags.add(TALB(encoding=3, text=album))
+    if cover:
+        tags.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='Cover', data=cover))
+    tags.save(path)
+
+
+def write_mp4(path, seconds, title, artist, album, cover=None):
+    with open(path, 'wb') as f:
+        f.write(_mp4_skeleton(seconds))
+    m = MP4(path)
+    m.add_tags()
+    m['\xa9nam'] = [title]
+    m['\xa9ART'] = [artist]
+    m['\xa9alb'] = [album]
+    if cover:
+        m['covr'] = [MP4Cover(cover, imageformat=MP4Cover.FORMAT_JPEG)]
+    m.save()
+
+
+def write_media_file(path, size_mb):
+    """A large MP3 (just frames) for streaming benchmarks."""
+    frames = int(size_mb * 1024 * 1024 / len(MP3_FRAME)) + 1
+    with open(path, 'wb') as f:
+        for i in range(0, frames, 2048):
+            f.write(MP3_FRAME * min(2048, frames - i))
+    return path
+
+
+def generate_library(root, tracks=500, depth=2, fanout=4, cover_kb=64, cover_ratio=0.8,
+                     video_ratio=0.1, seconds=10, seed=1):
+    """Writes `tracks` files below root, spread over `fanout`^`depth` folders. Returns the paths."""
+    rng = random.Random(seed)
+    root = Path(root)
+    folders = [root]
+    for _ in range(depth):
+        folders = [f / f"{_name(rng, 1).lower()}_{i}" for f in folders for i in range(fanout)]
+    for folder in folders:
+        folder.mkdir(parents=True, exist_ok=True)
+    artists = [_name(rng) for _ in range(max(1, tracks // 10))]
+    paths = []
+    for i in range(tracks):
+        folder = folders[i % len(folders)]
+        artist = rng.choice(artists)
+        title = f"{_name(rng, 3)} {i}"
+        album = _name(rng)
+        cover = _cover(rng, cover_kb * 1024) if rng.random() < cover_ratio else None
+        if rng.random() < video_ratio:
+            path = folder / f"{i:06d} {artist} - {title}.mp4"
+            write_mp4(str(path), seconds, title, artist, album, cover)
+        else:
+            path = folder / f"{i:06d} {artist} - {title}.mp3"
+            write_mp3(str(path), seconds, title, artist, album, cover)
+        paths.append(str(path))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", help="target directory")
+    parser.add_argument("--tracks", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=2, help="directory levels below OUT")
+    parser.add_argument("--fanout", type=int, default=4, help="subfolders per level")
+    parser.add_argument("--cover-kb", type=int, default=64, help="embedded cover size (0 = none)")
+    parser.add_argument("--cover-ratio", type=float, default=0.8)
+    parser.add_argument("--video-ratio", type=float, default=0.1, help="share of MP4 files")
+    parser.add_argument("--seconds", type=float, default=10, help="duration per track")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    paths = generate_library(args.out, args.tracks, args.depth, args.fanout, args.cover_kb,
+                             args.cover_ratio, args.video_ratio, args.seconds, args.seed)
+    print(f"{len(paths)} files written to {os.path.abspath(args.out)}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
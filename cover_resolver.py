@@ -0,0 +1,170 @@
+"""Gemeinsame Cover-Auflösung für den Player (main.py) und den Discord-Bot (discord_vc_bot.py).
+
+Uploads zu tmpfiles.org werden über einen Hash der Bildbytes, iTunes-Treffer über den
+normalisierten Titel/Künstler in einer kleinen SQLite-Datenbank zwischengespeichert.
+Fehlschläge werden ebenfalls (kürzer) gecacht, damit Wiederholungen keine Netzwerkzugriffe kosten.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+from metrics import registry, LATENCY_BUCKETS
+
+COVER_CACHE_DB = Path(__file__).parent / "cover_cache.db"
+COVER_CACHE_MAX_ENTRIES = 5000
+
+# tmpfiles.org löscht Uploads nach 60 Minuten, wir verwenden sie nur 55 Minuten lang
+UPLOAD_TTL = 55 * 60
+UPLOAD_FAIL_TTL = 5 * 60
+ITUNES_TTL = 30 * 24 * 3600
+ITUNES_MISS_TTL = 24 * 3600
+ITUNES_ERROR_TTL = 5 * 60
+
+
+class CoverResolutionCache:
+    """Persistent key -> URL cache with TTLs, negative entries and LRU eviction by entry count."""
+
+    def __init__(self, db_path=COVER_CACHE_DB, max_entries=COVER_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS covers ("
+                "key TEXT PRIMARY KEY, url TEXT, expires REAL, last_used REAL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """Returns (hit, url); url is None for a cached miss."""
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute("SELECT url, expires FROM covers WHERE key = ?", (key,)).fetchone()
+                if row and row[1] > now:
+                    db.execute("UPDATE covers SET last_used = ? WHERE key = ?", (now, key))
+                    db.commit()
+                    self.hits += 1
+                    return True, row[0] or None
+        except sqlite3.Error:
+            pass
+        self.misses += 1
+        return False, None
+
+    def put(self, key, url, ttl):
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO covers VALUES (?, ?, ?, ?)", (key, url or "", now + ttl, now)
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._evict(db, now)
+                db.commit()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, db, now):
+        """Drops expired entries, then the least recently used ones above max_entries."""
+        db.execute("DELETE FROM covers WHERE expires <= ?", (now,))
+        count = db.execute("SELECT COUNT(*) FROM covers").fetchone()[0]
+        if count > self.max_entries:
+            db.execute(
+                "DELETE FROM covers WHERE key IN (SELECT key FROM covers ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+
+cover_cache = CoverResolutionCache()
+
+lookup_seconds = registry.histogram(
+    "inferno_cover_lookup_seconds", "Duration of tmpfiles.org uploads and iTunes searches (cache misses only)",
+    ("service",), LATENCY_BUCKETS
+)
+registry.counter_func(
+    "inferno_cover_resolver_cache_total", "Cover resolver cache lookups by result",
+    lambda: {"hit": cover_cache.hits, "miss": cover_cache.misses}, ("result",)
+)
+
+
+def _clean(text):
+    return re.sub(r'[\(\[][^\)\]]*[\)\]]', '', text or "").strip()
+
+
+def itunes_key(title, artist):
+    """Normalized cache key, so '(Official Video)' variants and casing share one entry."""
+    norm = " ".join(f"{_clean(title)}|{_clean(artist)}".casefold().split())
+    return "itunes:" + norm
+
+
+def upload_key(cover_data):
+    return "upload:" + hashlib.sha256(cover_data).hexdigest()
+
+
+def upload_cover_to_tmpfiles(mime, cover_data, cache=cover_cache):
+    """Lädt lokale Cover-Bytes anonym auf tmpfiles.org hoch, um eine öffentliche URL für Discord zu erhalten."""
+    key = upload_key(cover_data)
+    hit, url = cache.get(key)
+    if hit: return url
+    url = None
+    start = time.perf_counter()
+    try:
+        import requests  # erst bei Bedarf laden, hält den Start des Players schlank
+        ext = "jpg" if "jpeg" in mime.lower() else "png"
+        files = {
+            'file': (f'cover.{ext}', cover_data, mime)
+        }
+        response = requests.post("https://tmpfiles.org/api/v1/upload", files=files, timeout=5)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("status") == "success":
+                url = data["data"]["url"].replace("https://tmpfiles.org/", "https://tmpfiles.org/dl/")
+    except Exception:
+        pass
+    lookup_seconds.observe(time.perf_counter() - start, "tmpfiles")
+    cache.put(key, url, UPLOAD_TTL if url else UPLOAD_FAIL_TTL)
+    return url
+
+
+def get_itunes_cover_url(title, artist, cache=cover_cache):
+    """Sucht kostenfrei über die iTunes API nach dem Cover (ohne Keys)."""
+    key = itunes_key(title, artist)
+    hit, url = cache.get(key)
+    if hit: return url
+    url, ttl = None, ITUNES_ERROR_TTL
+    start = time.perf_counter()
+    try:
+        import requests
+        query = f"{_clean(title)} {_clean(artist)}"
+        search = f"https://itunes.apple.com/search?term={urllib.parse.quote(query)}&entity=musicTrack&limit=1"
+        response = requests.get(search, timeout=3)
+        if response.status_code == 200:
+            data = response.json()
+            ttl = ITUNES_MISS_TTL
+            if data.get("resultCount", 0) > 0:
+                artwork_url = data["results"][0].get("artworkUrl100", "")
+                if artwork_url:
+                    url = artwork_url.replace("100x100bb.jpg", "600x600bb.jpg")
+                    ttl = ITUNES_TTL
+    except Exception:
+        pass
+    lookup_seconds.observe(time.perf_counter() - start, "itunes")
+    cache.put(key, url, ttl)
+    return url
@@ -5,10 +5,11 @@ from aiohttp import web
 import asyncio
 import os
 from dotenv import load_dotenv
-import queue
-import urllib.parse
-import requests
-import re
+import struct
+import threading
+import time
+from collections import deque
+import metrics
 
 # Lade Umgebungsvariablen aus der .env Datei
 load_dotenv()
@@ -18,81 +19,409 @@ load_dotenv()
 # ==========================================
 BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 WEB_PORT = int(os.getenv("WEB_PORT", 8081))
+BRIDGE_QUEUE_MS = int(os.getenv("BRIDGE_QUEUE_MS", 2000))   # maximaler Rückstau vom Player
+STATUS_INTERVAL = 1.0                                        # Sekunden zwischen Status-Meldungen
+BRIDGE_FORMAT = os.getenv("BRIDGE_FORMAT", "pcm").lower()    # "pcm" oder "opus" (vorkodiert im Player)
 # ==========================================
 
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents)
 
-current_vc = None
-audio_source = None
+audio_source = None   # gemeinsame Ingest-Quelle (Jitter-Buffer) für alle Voice Channels
+hub = None
+bridge_clients = set()
 
-def get_itunes_cover_url(title, artist):
-    """Sucht über die kostenlose iTunes API nach dem Cover (ohne Keys)."""
-    clean_title = re.sub(r'[\(\[][^\)\]]*[\)\]]', '', title).strip()
-    clean_artist = re.sub(r'[\(\[][^\)\]]*[\)\]]', '', artist).strip()
-    try:
-        query = f"{clean_title} {clean_artist}"
-        url = f"https://itunes.apple.com/search?term={urllib.parse.quote(query)}&entity=musicTrack&limit=1"
-        response = requests.get(url, timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("resultCount", 0) > 0:
-                artwork_url = data["results"][0].get("artworkUrl100", "")
-                if artwork_url:
-                    return artwork_url.replace("100x100bb.jpg", "600x600bb.jpg")
-    except Exception:
-        pass
-    return None
+OPUS_SILENCE = b'\xf8\xff\xfe'
 
 class WSAudioSource(discord.AudioSource):
-    """Liest Live PCM-Daten vom WebSocket und sendet sie an Discord mit Buffering."""
-    def __init__(self):
-        self.buffer = bytearray()
-        self.queue = queue.Queue()
+    """Liest Live PCM-Daten vom WebSocket und sendet sie an Discord mit Buffering.
+
+    Die Daten liegen in einem vorab allozierten Ringpuffer, read() kopiert pro Frame
+    nur 20 ms statt den gesamten Rückstand zu verschieben. Das Jitter-Ziel wächst bei
+    Aussetzern und schrumpft wieder, wenn die Verbindung stabil läuft; wird die
+    Latenzobergrenze überschritten, werden die ältesten Frames verworfen.
+    """
+    CHUNK_SIZE = 3840            # 20ms of 48kHz Stereo 16-bit PCM
+    FRAME_MS = 20
+    RING_FRAMES = 256            # ~5 Sekunden Kapazität
+    MIN_TARGET = 2               # 40ms
+    MAX_TARGET = 50              # 1 Sekunde (altes festes MIN_BUFFER_SIZE)
+    START_TARGET = 3             # 60ms bevor es losgeht (der Player liefert 20ms-Frames aus dem AudioWorklet)
+    STABLE_FRAMES = 500          # 10s ohne Aussetzer -> Ziel verkleinern
+    SILENCE = bytes(CHUNK_SIZE)
+    BYTES_PER_MS = CHUNK_SIZE // FRAME_MS
+
+    def __init__(self, max_queue_ms=BRIDGE_QUEUE_MS):
+        # Eingangs-Queue vom Websocket, begrenzt auf max_queue_ms; bei Überlauf fliegt das Älteste raus
+        self.queue = deque()
+        self.queue_bytes = 0
+        self.max_queue_bytes = max_queue_ms * self.BYTES_PER_MS
+        self.queue_lock = threading.Lock()
         self.active = True
         self.is_buffering = True # Startet im Buffering-Modus
-        self.CHUNK_SIZE = 3840   # 20ms of 48kHz Stereo 16-bit PCM
-        self.MIN_BUFFER_SIZE = self.CHUNK_SIZE * 50 # 1 Sekunde Buffer (50 * 20ms) bevor es losgeht
+        self.ring = bytearray(self.CHUNK_SIZE * self.RING_FRAMES)
+        self.view = memoryview(self.ring)
+        self.read_pos = 0        # absolute Byte-Positionen, Index = pos % len(ring)
+        self.write_pos = 0
+        self.target = self.START_TARGET
+        self.stable = 0
+        self.stats = {
+            "frames": 0, "silence_frames": 0, "underruns": 0, "dropped_frames": 0, "queue_dropped": 0,
+            "depth_ms": 0, "target_ms": self.target * self.FRAME_MS, "max_latency_ms": 0,
+        }
+
+    def feed(self, chunk):
+        """Wird vom Websocket-Handler aufgerufen; verwirft bei vollem Puffer die ältesten Pakete."""
+        if not self.active: return
+        with self.queue_lock:
+            self.queue.append(chunk)
+            self.queue_bytes += len(chunk)
+            while self.queue_bytes > self.max_queue_bytes and len(self.queue) > 1:
+                self.queue_bytes -= len(self.queue.popleft())
+                self.stats["queue_dropped"] += 1
+
+    def queue_ms(self):
+        return self.queue_bytes // self.BYTES_PER_MS
+
+    def status(self):
+        """Kurzer Zustandsbericht für den Player (Steuerkanal)."""
+        return dict(self.stats, type="status", queue_ms=self.queue_ms(), buffering=self.is_buffering)
+
+    def depth(self):
+        return self.write_pos - self.read_pos
+
+    def frames(self):
+        """Anzahl vollständiger 20ms-Frames im Puffer."""
+        return self.depth() // self.CHUNK_SIZE
+
+    def ceiling(self):
+        """Maximale Pufferlänge in Frames, ab der Audio verworfen wird."""
+        return max(self.target * 3, self.target + 25)
+
+    def _write(self, chunk):
+        size = len(self.ring)
+        data = memoryview(chunk)
+        if len(data) > size:
+            data = data[len(data) - size:]
+        n = len(data)
+        overflow = self.depth() + n - size
+        if overflow > 0:
+            # Ring voll: älteste ganze Frames verwerfen
+            frames = -(-overflow // self.CHUNK_SIZE)
+            self.read_pos += frames * self.CHUNK_SIZE
+            self.stats["dropped_frames"] += frames
+        start = self.write_pos % size
+        first = min(n, size - start)
+        self.view[start:start + first] = data[:first]
+        if first < n:
+            self.view[:n - first] = data[first:]
+        self.write_pos += n
+
+    def _skip_to(self, frames):
+        """Verwirft die ältesten Frames, bis nur noch `frames` übrig sind."""
+        drop = self.frames() - frames
+        self.read_pos += drop * self.CHUNK_SIZE
+        self.stats["dropped_frames"] += drop
+
+    def _take_frame(self):
+        start = self.read_pos % len(self.ring)
+        self.read_pos += self.CHUNK_SIZE
+        # Ringgröße ist ein Vielfaches der Framegröße, ein Frame liegt nie über der Grenze
+        return bytes(self.view[start:start + self.CHUNK_SIZE])
+
+    def _silence(self):
+        self.stats["silence_frames"] += 1
+        return self.SILENCE
 
     def read(self):
         if not self.active:
             return b''
-            
-        # Übertrage Daten aus der Queue in den internen Buffer
-        while not self.queue.empty():
-            try:
-                chunk = self.queue.get_nowait()
-                if chunk is None:
-                    self.active = False
-                    return b''
-                self.buffer.extend(chunk)
-            except queue.Empty:
-                break
 
-        # Wenn wir noch buffern, prüfe ob wir genug Daten haben
+        # Übertrage Daten aus der Queue in den Ringpuffer
+        if self.queue:
+            with self.queue_lock:
+                chunks, self.queue = self.queue, deque()
+                self.queue_bytes = 0
+            for chunk in chunks:
+                self._write(chunk)
+
+        frames = self.frames()
+        self.stats["depth_ms"] = frames * self.FRAME_MS
+
+        # Wenn wir noch buffern, prüfe ob wir das Jitter-Ziel erreicht haben
         if self.is_buffering:
-            if len(self.buffer) >= self.MIN_BUFFER_SIZE:
+            if frames >= self.target:
                 self.is_buffering = False
-                print("Audio-Buffer voll! Starte flüssige Wiedergabe.")
+                print(f"Audio-Buffer bereit ({self.target * self.FRAME_MS} ms). Starte Wiedergabe.")
             else:
                 # Sende Stille an Discord während wir buffern
-                return b'\x00' * self.CHUNK_SIZE
+                return self._silence()
 
-        # Wenn wir nicht genug Daten haben, gehen wir wieder in den Buffering-Modus
-        if len(self.buffer) < self.CHUNK_SIZE:
+        # Wenn wir nicht genug Daten haben: Ziel vergrößern und nachbuffern
+        if frames < 1:
             self.is_buffering = True
-            print("Audio stottert, buffere nach...")
-            return b'\x00' * self.CHUNK_SIZE
-                
-        # Extrahiere exakt 3840 Bytes (20ms) für Discord
-        res = bytes(self.buffer[:self.CHUNK_SIZE])
-        del self.buffer[:self.CHUNK_SIZE]
-        return res
+            self.stable = 0
+            self.target = min(self.MAX_TARGET, self.target + max(2, self.target // 2))
+            self.stats["underruns"] += 1
+            self.stats["target_ms"] = self.target * self.FRAME_MS
+            print(f"Audio stottert, buffere nach ({self.target * self.FRAME_MS} ms)...")
+            return self._silence()
+
+        # Rückstand über der Latenzgrenze: auf das Ziel zurückspringen
+        if frames > self.ceiling():
+            self._skip_to(self.target)
+            frames = self.target
+
+        self.stable += 1
+        if self.stable >= self.STABLE_FRAMES and self.target > self.MIN_TARGET:
+            self.stable = 0
+            self.target -= 1
+            self.stats["target_ms"] = self.target * self.FRAME_MS
+
+        self.stats["frames"] += 1
+        self.stats["max_latency_ms"] = max(self.stats["max_latency_ms"], frames * self.FRAME_MS)
+        return self._take_frame()
 
     def stop(self):
         self.active = False
-        self.queue.put(None)
+        with self.queue_lock:
+            self.queue.clear()
+            self.queue_bytes = 0
+
+class OpusAudioSource(WSAudioSource):
+    """Nimmt fertige 20ms Opus-Pakete vom Player entgegen und reicht sie ohne Re-Encoding an Discord weiter.
+
+    Jedes Websocket-Paket beginnt mit einem 9-Byte Header (Typ, Sequenznummer, Zeitstempel
+    in 48kHz-Samples). Über die Sequenznummer werden Pakete sortiert sowie Verluste und
+    verspätete Pakete erkannt; springt der Zeitstempel zurück, hat der Player neu gestartet.
+    """
+    HEADER = struct.Struct("!BII")
+    KIND_OPUS = 1
+    SAMPLES_PER_FRAME = 960
+    SILENCE = OPUS_SILENCE
+    RESYNC_GAP = 250             # Sprung nach vorne (Frames), ab dem neu synchronisiert wird
+    RESTART_SEQ = 1              # Plugin neu geladen: die Sequenznummern beginnen wieder bei 0
+
+    def __init__(self, max_queue_ms=BRIDGE_QUEUE_MS):
+        super().__init__(max_queue_ms)
+        self.ring = self.view = None
+        self.max_queue_packets = max(1, max_queue_ms // self.FRAME_MS)
+        self.packets = {}
+        self.next_seq = None
+        self.last_timestamp = None
+        self.stats.update(lost_packets=0, late_packets=0, resyncs=0)
+
+    def is_opus(self):
+        return True
+
+    def feed(self, chunk):
+        if not self.active: return
+        with self.queue_lock:
+            self.queue.append(chunk)
+            while len(self.queue) > self.max_queue_packets:
+                self.queue.popleft()
+                self.stats["queue_dropped"] += 1
+
+    def queue_ms(self):
+        return len(self.queue) * self.FRAME_MS
+
+    def frames(self):
+        return len(self.packets)
+
+    def _resync(self, seq):
+        self.packets.clear()
+        self.next_seq = seq
+        self.stats["resyncs"] += 1
+
+    def _write(self, chunk):
+        if len(chunk) <= self.HEADER.size: return
+        kind, seq, timestamp = self.HEADER.unpack_from(chunk)
+        if kind != self.KIND_OPUS: return
+        restarted = self.last_timestamp is not None and \
+            self.last_timestamp - timestamp > self.MAX_TARGET * self.SAMPLES_PER_FRAME
+        self.last_timestamp = timestamp
+        if self.next_seq is not None:
+            # Zurück auf den Anfang (auch kurz nach dem Start, wo Zeitstempel und Jitter-Fenster
+            # noch nicht greifen), weiter zurück als das größte Jitter-Fenster oder weit voraus:
+            # Player hat neu gestartet
+            if seq < self.next_seq and seq <= self.RESTART_SEQ:
+                restarted = True
+            if restarted or seq + self.MAX_TARGET < self.next_seq or seq > self.next_seq + self.RESYNC_GAP:
+                self._resync(seq)
+            elif seq < self.next_seq:
+                self.stats["late_packets"] += 1
+                return
+        self.packets[seq] = bytes(chunk[self.HEADER.size:])
+        if len(self.packets) > self.RING_FRAMES:
+            self.stats["dropped_frames"] += 1
+            self.packets.pop(min(self.packets))
+
+    def _skip_to(self, frames):
+        """Verwirft die ältesten Pakete, bis nur noch `frames` übrig sind."""
+        for seq in sorted(self.packets)[:len(self.packets) - frames]:
+            del self.packets[seq]
+            self.stats["dropped_frames"] += 1
+        self.next_seq = min(self.packets)
+
+    def _take_frame(self):
+        if self.next_seq is None:
+            self.next_seq = min(self.packets)
+        packet = self.packets.pop(self.next_seq, None)
+        self.next_seq += 1
+        if packet is None:
+            self.stats["lost_packets"] += 1
+            return self.SILENCE
+        return packet
+
+class StreamHub:
+    """Verteilt einen Player-Stream an beliebig viele Voice-Verbindungen (z. B. mehrere Server).
+
+    Ein eigener Thread liest im 20ms-Takt aus der Ingest-Quelle, kodiert (bei PCM) genau
+    einmal nach Opus und legt die Pakete in einem Ring ab. Jede Verbindung liest über einen
+    HubListener mit eigenem Cursor daraus; wer hinterherhängt, springt nach vorne, statt
+    die anderen aufzuhalten.
+    """
+    FRAME_MS = 20
+    RING_FRAMES = 256
+    LEAD = 2                     # Abstand eines neuen Listeners zum Kopf (Frames)
+    MAX_LAG = 50                 # ab 1s Rückstand springt ein Listener nach vorne
+
+    def __init__(self, source):
+        self.source = source
+        self.ring = [OPUS_SILENCE] * self.RING_FRAMES
+        self.head = 0            # Index des nächsten zu schreibenden Frames
+        self.listeners = set()
+        self.active = True
+        self.encoder = None if source.is_opus() else discord.opus.Encoder()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        interval = self.FRAME_MS / 1000
+        start = time.perf_counter()
+        loops = 0
+        while self.active:
+            frame = self.source.read()
+            if not frame:
+                break
+            if self.encoder:
+                frame = self.encoder.encode(frame, self.encoder.SAMPLES_PER_FRAME)
+            self.ring[self.head % self.RING_FRAMES] = frame
+            self.head += 1
+            loops += 1
+            delay = start + loops * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -0.2:
+                # Thread wurde blockiert: Takt neu setzen statt hinterherzuhetzen
+                start, loops = time.perf_counter(), 0
+        self.active = False
+
+    def listener(self):
+        listener = HubListener(self)
+        self.listeners.add(listener)
+        return listener
+
+    def remove(self, listener):
+        self.listeners.discard(listener)
+
+    def stop(self):
+        self.active = False
+        self.source.stop()
+
+    def status(self):
+        return {
+            "listeners": len(self.listeners),
+            "listener_lag_ms": max((l.lag() * self.FRAME_MS for l in self.listeners), default=0),
+            "listener_underruns": sum(l.underruns for l in self.listeners),
+            "listener_skipped": sum(l.skipped for l in self.listeners),
+        }
+
+class HubListener(discord.AudioSource):
+    """Eine Voice-Verbindung am StreamHub; liefert bereits kodierte Opus-Pakete."""
+    def __init__(self, hub):
+        self.hub = hub
+        self.cursor = max(0, hub.head - hub.LEAD)
+        self.underruns = 0
+        self.skipped = 0
+
+    def is_opus(self):
+        return True
+
+    def lag(self):
+        return self.hub.head - self.cursor
+
+    def read(self):
+        hub = self.hub
+        head = hub.head
+        if self.cursor >= head:
+            if not hub.active:
+                return b''
+            self.underruns += 1
+            return OPUS_SILENCE
+        if head - self.cursor > hub.MAX_LAG:
+            self.skipped += head - hub.LEAD - self.cursor
+            self.cursor = head - hub.LEAD
+        frame = hub.ring[self.cursor % hub.RING_FRAMES]
+        self.cursor += 1
+        return frame
+
+    def cleanup(self):
+        self.hub.remove(self)
+
+def capture_wanted():
+    return audio_source is not None and audio_source.active
+
+def capture_message():
+    fmt = "opus" if isinstance(audio_source, OpusAudioSource) else "pcm"
+    return {"type": "capture", "enabled": capture_wanted(), "format": fmt}
+
+async def send_control(ws, message):
+    try:
+        await ws.send_json(message)
+    except Exception:
+        pass
+
+async def broadcast_capture():
+    """Sagt allen verbundenen Playern, ob sie Audio aufnehmen sollen."""
+    message = capture_message()
+    for ws in list(bridge_clients):
+        await send_control(ws, message)
+
+async def report_status(ws):
+    """Meldet dem Player regelmäßig Queue-Tiefe und Drop-Zähler, solange gestreamt wird."""
+    while not ws.closed:
+        await asyncio.sleep(STATUS_INTERVAL)
+        if capture_wanted():
+            await send_control(ws, dict(audio_source.status(), **hub.status()))
+
+def ensure_hub():
+    """Startet Ingest-Quelle und Hub beim ersten Listener."""
+    global audio_source, hub
+    if hub is None or not hub.active:
+        audio_source = OpusAudioSource() if BRIDGE_FORMAT == "opus" else WSAudioSource()
+        hub = StreamHub(audio_source)
+        hub.start()
+    return hub
+
+async def release_hub():
+    """Stoppt den Stream, sobald kein Voice Channel mehr zuhört."""
+    global audio_source, hub
+    if hub and not hub.listeners:
+        hub.stop()
+        hub = audio_source = None
+        await bot.change_presence(activity=None)
+    await broadcast_capture()
+
+def on_playback_end(listener, error):
+    """Callback aus dem Voice-Thread, wenn die Wiedergabe endet (z. B. Verbindung getrennt)."""
+    if error:
+        print(f"Voice Fehler: {error}")
+    listener.hub.remove(listener)
+    asyncio.run_coroutine_threadsafe(release_hub(), bot.loop)
 
 async def websocket_handler(request):
     """Empfängt die rohen PCM Audiodaten vom JS Plugin"""
@@ -101,14 +430,22 @@ async def websocket_handler(request):
     await ws.prepare(request)
     
     print("Player verbunden! Empfange Live-Audiostream...")
-    
-    async for msg in ws:
-        if msg.type == aiohttp.WSMsgType.BINARY:
-            if audio_source and audio_source.active:
-                audio_source.queue.put(msg.data)
-        elif msg.type == aiohttp.WSMsgType.ERROR:
-            print(f"Websocket Fehler: {ws.exception()}")
-            
+    bridge_clients.add(ws)
+    await send_control(ws, capture_message())
+    reporter = asyncio.create_task(report_status(ws))
+
+    try:
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.BINARY:
+                ws_bytes.inc(amount=len(msg.data))
+                if audio_source and audio_source.active:
+                    audio_source.feed(msg.data)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                print(f"Websocket Fehler: {ws.exception()}")
+    finally:
+        reporter.cancel()
+        bridge_clients.discard(ws)
+
     print("Player getrennt.")
     return ws
 
@@ -150,20 +487,20 @@ async def handle_update(request):
 @bot.command()
 async def join(ctx):
     """Lässt den Bot dem aktuellen Voice Channel beitreten und startet den Stream"""
-    global current_vc, audio_source
     if ctx.author.voice:
         channel = ctx.author.voice.channel
-        if current_vc and current_vc.is_connected():
-            await current_vc.move_to(channel)
+        vc = ctx.guild.voice_client
+        if vc and vc.is_connected():
+            await vc.move_to(channel)
         else:
-            current_vc = await channel.connect()
-            
-        if audio_source:
-            audio_source.stop()
-            
-        # Starte den Stream, der auf Daten vom WebSocket wartet
-        audio_source = WSAudioSource()
-        current_vc.play(audio_source)
+            vc = await channel.connect()
+
+        # Jeder Server hängt sich mit eigenem Cursor an denselben Stream
+        if vc.is_playing():
+            vc.stop()
+        listener = ensure_hub().listener()
+        vc.play(listener, after=lambda e, l=listener: on_playback_end(l, e))
+        await broadcast_capture()
         
         await ctx.send(f"Bin dem Channel **{channel.name}** beigetreten! Streame das Audio vom Player live.")
     else:
@@ -172,22 +509,96 @@ async def join(ctx):
 @bot.command()
 async def leave(ctx):
     """Lässt den Bot den Voice Channel verlassen"""
-    global current_vc, audio_source
-    if audio_source:
-        audio_source.stop()
-        audio_source = None
-        
-    if current_vc and current_vc.is_connected():
-        await current_vc.disconnect()
-        current_vc = None
-        await bot.change_presence(activity=None)
+    vc = ctx.guild.voice_client
+    if vc and vc.is_connected():
+        if isinstance(vc.source, HubListener):
+            vc.source.hub.remove(vc.source)
+        await vc.disconnect()
+        await release_hub()
         await ctx.send("Habe den Voice Channel verlassen.")
 
+# ==========================================
+# METRIKEN (/metrics, Prometheus-Textformat)
+# ==========================================
+# Die Audio-Pfade zählen ohnehin schon in ihren stats-Dicts mit; die werden erst beim
+# Scrapen gelesen. Pro Request bzw. WebSocket-Nachricht kommt nur ein Zähler dazu.
+METRIC_ROUTES = ('/update', '/ws', '/metrics')
+
+http_requests = metrics.registry.counter(
+    "inferno_bridge_http_requests_total", "Bridge API requests by route and status code", ("route", "code"))
+http_seconds = metrics.registry.histogram(
+    "inferno_bridge_http_request_duration_seconds", "Bridge API request duration (without /ws)", ("route",))
+ws_bytes = metrics.registry.counter(
+    "inferno_bridge_received_bytes_total", "Audio bytes received from the player over /ws")
+
+def _stat(key):
+    source = audio_source
+    return source.stats.get(key) if source else None
+
+def _stats(mapping):
+    source = audio_source
+    if not source: return None
+    return {label: source.stats[key] for label, key in mapping.items() if key in source.stats}
+
+metrics.registry.gauge_func("inferno_bridge_clients", "Connected player WebSockets", lambda: len(bridge_clients))
+metrics.registry.gauge_func(
+    "inferno_bridge_queue_ms", "Audio waiting in the ingest queue",
+    lambda: audio_source.queue_ms() if audio_source else None)
+metrics.registry.gauge_func("inferno_bridge_buffer_ms", "Audio in the jitter buffer", lambda: _stat("depth_ms"))
+metrics.registry.gauge_func("inferno_bridge_target_ms", "Current jitter buffer target", lambda: _stat("target_ms"))
+metrics.registry.gauge_func(
+    "inferno_bridge_buffering", "1 while the source is (re)buffering",
+    lambda: int(audio_source.is_buffering) if audio_source else None)
+metrics.registry.counter_func("inferno_bridge_frames_total", "20 ms frames handed to Discord", lambda: _stat("frames"))
+metrics.registry.counter_func(
+    "inferno_bridge_silence_frames_total", "Frames filled with silence", lambda: _stat("silence_frames"))
+metrics.registry.counter_func(
+    "inferno_bridge_underruns_total", "Times the jitter buffer ran dry and went back to buffering",
+    lambda: _stat("underruns"))
+metrics.registry.counter_func(
+    "inferno_bridge_dropped_frames_total", "Dropped audio by stage (jitter buffer over latency cap, full ingest queue)",
+    lambda: _stats({"jitter": "dropped_frames", "queue": "queue_dropped"}), ("stage",))
+metrics.registry.counter_func(
+    "inferno_bridge_opus_packets_total", "Opus packet anomalies (BRIDGE_FORMAT=opus)",
+    lambda: _stats({"lost": "lost_packets", "late": "late_packets", "resync": "resyncs"}), ("event",))
+metrics.registry.gauge_func(
+    "inferno_bridge_listeners", "Voice connections reading from the stream hub",
+    lambda: hub.status()["listeners"] if hub else None)
+metrics.registry.gauge_func(
+    "inferno_bridge_listener_lag_ms", "Largest lag of a voice connection behind the hub",
+    lambda: hub.status()["listener_lag_ms"] if hub else None)
+metrics.registry.counter_func(
+    "inferno_bridge_listener_events_total", "Voice connection underruns and forward skips",
+    lambda: {"underrun": hub.status()["listener_underruns"], "skipped": hub.status()["listener_skipped"]} if hub else None,
+    ("event",))
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    route = request.path if request.path in METRIC_ROUTES else "other"
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        http_requests.inc(route, str(status))
+        if route != '/ws':
+            http_seconds.observe(time.perf_counter() - start, route)
+
+async def handle_metrics(request):
+    return web.Response(body=metrics.registry.render().encode('utf-8'),
+                        headers={"Content-Type": metrics.CONTENT_TYPE, "Cache-Control": "no-store"})
+
 async def web_server():
     """Startet den lokalen Webserver für das JS-Plugin"""
-    app = web.Application()
+    app = web.Application(middlewares=[metrics_middleware])
     app.router.add_post('/update', handle_update)
     app.router.add_get('/ws', websocket_handler)
+    app.router.add_get('/metrics', handle_metrics)
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, '127.0.0.1', WEB_PORT)
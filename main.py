@@ -1,27 +1,43 @@
+import time
+PROCESS_START = time.perf_counter()  # Referenzpunkt für das Startzeit-Budget
 import webview
 import os
 import base64
+import io
 import json
-import tkinter as tk
-from tkinter import filedialog
-from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB
+from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB, TXXX
 from mutagen import File as MutagenFile
 from mutagen.mp3 import MP3
 from mutagen.mp4 import MP4
 from pathlib import Path
 import urllib.parse
+import email.utils
 from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 import threading
-import time
-import requests
+import queue
+import heapq
 import platform
 import subprocess
-from pypresence import Presence
+import sys
+import select
+import struct
+import ctypes
+import ctypes.util
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import unicodedata
+import sqlite3
+import hashlib
+import shutil
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from cover_resolver import upload_cover_to_tmpfiles, get_itunes_cover_url
+import metrics
 
-# --- DOWNLOADER LIBRARIES ---
-import yt_dlp
+# --- LAZY IMPORTS ---
+# yt_dlp, tkinter, pypresence, requests, numpy und Pillow kosten zusammen spürbar Startzeit; sie
+# werden erst beim ersten Download, Dateidialog, Discord-Update, Radio-Request, Waveform bzw.
+# Cover-Thumbnail importiert.
 
 # --- ENV LOADER ---
 def load_env():
@@ -66,131 +82,1194 @@ window = None
 
 #---FAVOURITES STORAGE---
 FAV_FILE = Path(__file__).parent / "favourites.json"
+FAV_JOURNAL_FILE = Path(__file__).parent / "favourites.journal"
+FAV_COMPACT_OPS = 200    # nach so vielen Journal-Einträgen wird der Snapshot neu geschrieben
+
+#---LIBRARY INDEX STORAGE---
+LIBRARY_DB = Path(__file__).parent / "library.db"
+LIBRARY_SNAPSHOT_FILE = Path(__file__).parent / "library_snapshot.json"
+MEDIA_EXTS = ('.mp3', '.ogg', '.wav', '.mp4', '.webm')
+
+#---STARTUP BUDGET---
+# Prozessstart bis zum ersten abspielbaren Track in der Liste
+STARTUP_BUDGET_MS = int(os.environ.get("STARTUP_BUDGET_MS", 1500))
+STARTUP_TRACE = os.environ.get("STARTUP_TRACE", "0") not in ("", "0")
+
+#---FOLDER WATCHER---
+WATCH_DEBOUNCE = 1.5     # Sekunden Ruhe, bevor Änderungen verarbeitet werden
+WATCH_MAX_DELAY = 10     # spätestens dann wird auch bei Dauer-Events geflusht
+WATCH_POLL_INTERVAL = 5  # Fallback ohne inotify: Verzeichnis-mtimes alle 5s prüfen
+
+#---PROGRESSIVE SCAN---
+SCAN_BATCH_SIZE = 500
+SCAN_BATCH_INTERVAL = 0.2
+
+#---COVER THUMBNAIL CACHE---
+COVER_CACHE_DIR = Path(__file__).parent / "cache" / "covers"
+COVER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+COVER_THUMB_SIZE = 64
+COVER_PLAYER_SIZE = 600
+
+#---WAVEFORM PEAKS---
+WAVEFORM_CACHE_DIR = Path(__file__).parent / "cache" / "waveforms"
+WAVEFORM_BINS = 1000           # min/max-Paare pro Track
+WAVEFORM_SAMPLE_RATE = 8000    # für die Hüllkurve reicht ein Mono-Downmix mit 8 kHz
+WAVEFORM_WORKERS = 2
+WAVEFORM_QUEUE_MAX = 256
+WAVEFORM_TIMEOUT = 120        # Sekunden; kaputte oder hängende Dateien blockieren sonst einen Worker
+
+#---DOWNLOAD MANAGER---
+DOWNLOAD_JOBS_FILE = Path(__file__).parent / "downloads.json"
+DOWNLOAD_HISTORY = 50    # abgeschlossene Jobs, die in der Liste bleiben
+
+#---USER IMAGES (STATION LOGOS, FAVOURITE COVERS)---
+IMAGE_STORE_DIR = Path(__file__).parent / "images"
+IMAGE_TYPES = {'.png': 'image/png', '.jpg': 'image/jpeg', '.webp': 'image/webp', '.gif': 'image/gif'}
+
+#---MEDIA STREAMING---
+STREAM_CHUNK_SIZE = 256 * 1024
+MEDIA_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.ogg': 'audio/ogg',
+    '.wav': 'audio/wav',
+    '.mp4': 'video/mp4',
+    '.webm': 'video/webm',
+}
 
 # --- HELPERS FOR COVERS (NO SPOTIFY) ---
-def load_stations():
-    """Lädt die Radiosender aus der stations_config.json oder erstellt Standardeinträge."""
-    default_stations = [
-        {"name": "Lofi Girl", "url": "https://lofi.stream.laut.fm/lofi", "genre": "Lofi", "image": "https://i.imgur.com/E8S9p8u.png"},
-        {"name": "Nightride FM", "url": "https://stream.nightride.fm/nightride.mp3", "genre": "Synthwave", "image": "https://i.imgur.com/B9M9M6Z.png"},
-        {"name": "BBC Radio 1", "url": "http://stream.live.vc.bbc.co.uk/bbc_radio_one", "genre": "Pop", "image": "https://i.imgur.com/Wl1qPqS.png"},
-        {"name": "RADIO 21", "url": "https://radio21.streamabc.net/radio21-hannover-mp3-192-3735655?sABC=690695p5%230%23q6ss393s0rn89n5s70n8q4721287ssr5%23jro&aw_0_1st.playerid=web&amsparams=playerid:web;skey:1762039237", "genre": "Rock n' Pop", "image": "https://i.imgur.com/8Nf9u8P.png"}
-    ]
-    if not STATIONS_FILE.exists():
-        try:
-            with open(STATIONS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(default_stations, f, indent=4)
-        except: pass
-        return default_stations
+DEFAULT_STATIONS = [
+    {"name": "Lofi Girl", "url": "https://lofi.stream.laut.fm/lofi", "genre": "Lofi", "image": "https://i.imgur.com/E8S9p8u.png"},
+    {"name": "Nightride FM", "url": "https://stream.nightride.fm/nightride.mp3", "genre": "Synthwave", "image": "https://i.imgur.com/B9M9M6Z.png"},
+    {"name": "BBC Radio 1", "url": "http://stream.live.vc.bbc.co.uk/bbc_radio_one", "genre": "Pop", "image": "https://i.imgur.com/Wl1qPqS.png"},
+    {"name": "RADIO 21", "url": "https://radio21.streamabc.net/radio21-hannover-mp3-192-3735655?sABC=690695p5%230%23q6ss393s0rn89n5s70n8q4721287ssr5%23jro&aw_0_1st.playerid=web&amsparams=playerid:web;skey:1762039237", "genre": "Rock n' Pop", "image": "https://i.imgur.com/8Nf9u8P.png"}
+]
+
+def write_json_atomic(path, data, **kwargs):
+    """Writes JSON to a temp file next to `path` and renames it over the target."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        with open(STATIONS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
     except:
-        return default_stations
+        try: tmp.unlink()
+        except OSError: pass
+        raise
 
-def upload_cover_to_tmpfiles(mime, cover_data):
-    """Lädt lokale Cover-Bytes anonym auf tmpfiles.org hoch, um eine öffentliche URL für Discord zu erhalten."""
+def load_stations():
+    """Lädt die Radiosender aus der stations_config.json oder erstellt Standardeinträge."""
+    return station_registry.all()
+
+def read_tags(path_str, with_cover=True):
+    """Reads title/artist/album/duration and (optionally) the raw APIC cover of a file."""
+    info = {
+        "title": os.path.basename(path_str),
+        "artist": "Unknown Artist",
+        "album": "Unknown Album",
+        "duration": 0,
+        "type": "audio",
+        "has_cover": False,
+        "cover_mime": None,
+        "cover_data": None,
+        "source_id": None
+    }
     try:
-        ext = "jpg" if "jpeg" in mime.lower() else "png"
-        files = {
-            'file': (f'cover.{ext}', cover_data, mime)
-        }
-        response = requests.post("https://tmpfiles.org/api/v1/upload", files=files, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("status") == "success":
-                return data["data"]["url"].replace("https://tmpfiles.org/", "https://tmpfiles.org/dl/")
-    except:
-        pass
-    return None
+        if path_str.lower().endswith(('.mp4', '.webm')):
+            info["type"] = "video"
+            m = MutagenFile(path_str)
+            if m: info["duration"] = m.info.length
+        elif path_str.lower().endswith('.mp3'):
+            audio = MP3(path_str, ID3=ID3)
+            info["duration"] = audio.info.length
+            if audio.tags:
+                if 'TIT2' in audio.tags: info["title"] = str(audio.tags['TIT2'].text[0])
+                if 'TPE1' in audio.tags: info["artist"] = str(audio.tags['TPE1'].text[0])
+                if 'TALB' in audio.tags: info["album"] = str(audio.tags['TALB'].text[0])
+                if 'TXXX:source_id' in audio.tags: info["source_id"] = str(audio.tags['TXXX:source_id'].text[0])
+                for tag in audio.tags.values():
+                    if isinstance(tag, APIC):
+                        info["has_cover"] = True
+                        if with_cover:
+                            info["cover_mime"] = tag.mime
+                            info["cover_data"] = tag.data
+                        break
+    except: pass
+    return info
 
-def get_itunes_cover_url(title, artist):
-    """Sucht kostenfrei über die iTunes API nach dem Cover."""
-    clean_title = re.sub(r'[\(\[][^\)\]]*[\)\]]', '', title).strip()
-    clean_artist = re.sub(r'[\(\[][^\)\]]*[\)\]]', '', artist).strip()
+def scan_record(path_str):
+    """Compact index record: (path, name, artist, album, duration, has_cover, filename, source_id)."""
+    info = read_tags(path_str, with_cover=False)
+    return (path_str, info["title"], info["artist"], info["album"], info["duration"],
+            int(info["has_cover"]), os.path.basename(path_str), info["source_id"])
+
+def scan_records(paths):
+    """Worker entry point: extracts a whole chunk so one IPC round-trip covers many files."""
+    records = []
+    for path_str in paths:
+        try:
+            records.append(scan_record(path_str))
+        except Exception:
+            pass
+    return records
+
+def extract_cover(path_str):
+    """Returns (mime, bytes) of the embedded APIC cover or None."""
     try:
-        query = f"{clean_title} {clean_artist}"
-        url = f"https://itunes.apple.com/search?term={urllib.parse.quote(query)}&entity=musicTrack&limit=1"
-        response = requests.get(url, timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("resultCount", 0) > 0:
-                artwork_url = data["results"][0].get("artworkUrl100", "")
-                if artwork_url:
-                    return artwork_url.replace("100x100bb.jpg", "600x600bb.jpg")
-    except:
-        pass
+        tags = ID3(path_str)
+        for tag in tags.values():
+            if isinstance(tag, APIC):
+                return tag.mime, tag.data
+    except: pass
     return None
 
+def cover_key(path_str, file_size, mtime):
+    """Content key of a track cover; changes whenever the file (or the track behind a reused id) changes."""
+    return hashlib.sha1(f"{path_str}|{file_size}|{mtime}".encode('utf-8')).hexdigest()
+
+def cover_url(track_id, key, size=COVER_THUMB_SIZE):
+    """Builds the media server URL for a track cover.
+
+    rowids werden nach dem Löschen wiederverwendet, deshalb steckt die Content-Version (v=)
+    mit in der URL -- sonst zeigt der Browser-Cache (max-age) das Cover eines gelöschten Tracks."""
+    return f"http://127.0.0.1:{MEDIA_PORT}/cover?id={track_id}&size={size}&v={key[:12]}"
+
 # --- DISCORD MANAGER ---
 class DiscordManager:
-    """Manages Discord Rich Presence communication in a non-blocking way."""
+    """Manages Discord Rich Presence communication in a non-blocking way.
+
+    A single worker thread owns the IPC connection. update() only stores the newest
+    payload in a one-element slot, so bursts collapse into one send and Discord's
+    update budget is respected without piling up threads.
+    """
+    UPDATE_INTERVAL = 15
+    RECONNECT_MIN = 2
+    RECONNECT_MAX = 60
+    MAX_ATTEMPTS = 3
+
     def __init__(self, client_id):
         self.client_id = client_id
         self.rpc = None
         self.enabled = False
         if client_id and client_id not in ("YOUR_DISCORD_ID", ""):
             self.enabled = True
+        self.stats = {"requested": 0, "sent": 0, "coalesced": 0, "dropped": 0, "failed": 0, "reconnects": 0}
+        self._cond = threading.Condition()
+        self._pending = None
+        self._last_payload = None
+        self._last_sent = 0.0
+        self._worker = None
 
     def connect(self):
         """Attempts to connect to the Discord client."""
         try:
             if not self.rpc:
+                from pypresence import Presence
                 self.rpc = Presence(self.client_id)
                 self.rpc.connect()
+                self.stats["reconnects"] += 1
+                self._last_payload = None
         except:
             self.rpc = None
+        return self.rpc is not None
 
     def update(self, title, artist, cover_url=None):
         """Updates the Discord status with optional album cover URL."""
         if not self.enabled: return
-        def _th():
-            try:
-                self.connect()
-                if self.rpc:
-                    img = cover_url if cover_url else "app_logo"
+        payload = (title, artist, cover_url or "app_logo")
+        with self._cond:
+            self.stats["requested"] += 1
+            if self._pending is not None:
+                self.stats["coalesced"] += 1
+            self._pending = (payload, time.time())
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def _take(self):
+        """Blocks until a payload is pending and the update budget allows sending it."""
+        with self._cond:
+            while True:
+                if self._pending is None:
+                    self._cond.wait()
+                    continue
+                wait = self._last_sent + self.UPDATE_INTERVAL - time.time()
+                if wait <= 0:
+                    item, self._pending = self._pending, None
+                    return item
+                self._cond.wait(wait)
+
+    def _run(self):
+        backoff = self.RECONNECT_MIN
+        while True:
+            item = self._take()
+            (title, artist, img), started = item
+            if item[0] == self._last_payload:
+                self.stats["dropped"] += 1
+                continue
+            for attempt in range(self.MAX_ATTEMPTS):
+                if not self.connect():
+                    self.stats["failed"] += 1
+                    if self._backoff(backoff): break
+                    backoff = min(backoff * 2, self.RECONNECT_MAX)
+                    continue
+                try:
                     self.rpc.update(
                         details=f"🎵 {title}",
                         state=f"by {artist}",
                         large_image=img,
                         large_text="Inferno Media Player",
-                        start=time.time()
+                        start=started
                     )
-            except: pass
-        threading.Thread(target=_th, daemon=True).start()
+                    self._last_payload = item[0]
+                    self._last_sent = time.time()
+                    self.stats["sent"] += 1
+                    backoff = self.RECONNECT_MIN
+                    break
+                except:
+                    # Verbindung verloren (Discord beendet/neu gestartet)
+                    self.stats["failed"] += 1
+                    try: self.rpc.close()
+                    except: pass
+                    self.rpc = None
+            else:
+                self.stats["dropped"] += 1
+
+    def _backoff(self, delay):
+        """Waits before reconnecting; returns True if a newer payload arrived meanwhile."""
+        with self._cond:
+            if self._pending is None:
+                self._cond.wait(delay)
+            if self._pending is not None:
+                self.stats["coalesced"] += 1
+                return True
+        return False
+
+def parse_byte_range(range_header, file_size):
+    """Parses a single 'bytes=' Range header into an inclusive (start, end) pair.
+
+    Returns None when the header is absent or unsupported (the whole file is sent)
+    and raises ValueError when the range cannot be satisfied.
+    """
+    if not range_header: return None
+    unit, _, spec = range_header.strip().partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec: return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep: raise ValueError(range_header)
+    first, last = first.strip(), last.strip()
+    if not first:
+        # Suffix-Range: die letzten N Bytes
+        suffix = int(last)
+        if suffix <= 0 or file_size == 0: raise ValueError(range_header)
+        return max(0, file_size - suffix), file_size - 1
+    start = int(first)
+    end = int(last) if last else file_size - 1
+    if start >= file_size or end < start: raise ValueError(range_header)
+    return start, min(end, file_size - 1)
+
+# --- STARTUP TIMING ---
+class StartupTimer:
+    """Milestones in ms since process start; 'first_track' is checked against the budget."""
+    def __init__(self, start, budget_ms, trace=False):
+        self.start = start
+        self.budget_ms = budget_ms
+        self.trace = trace
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Records a milestone once; later calls return the first value."""
+        with self._lock:
+            if name in self.marks: return self.marks[name]
+            ms = round((time.perf_counter() - self.start) * 1000, 1)
+            self.marks[name] = ms
+        if name == "first_track" and ms > self.budget_ms:
+            print(f"[startup] first track listed after {ms:.0f} ms, budget is {self.budget_ms} ms")
+        elif self.trace:
+            print(f"[startup] {name}: {ms:.0f} ms")
+        return ms
+
+    def report(self):
+        with self._lock:
+            first = self.marks.get("first_track")
+            return {"marks": dict(self.marks), "budget_ms": self.budget_ms,
+                    "within_budget": None if first is None else first <= self.budget_ms}
+
+startup_timer = StartupTimer(PROCESS_START, STARTUP_BUDGET_MS, STARTUP_TRACE)
+
+# --- LIBRARY SNAPSHOT ---
+class LibrarySnapshot:
+    """The last complete playlist of a folder, written after every finished scan.
+
+    preload() reads it in the background while the window is being created, so the
+    frontend can list tracks before the index is queried or the folder is walked; the
+    scan that follows only sends what differs.
+    """
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._loaded = threading.Event()
+        self._started = False
+
+    def preload(self):
+        self._started = True
+        threading.Thread(target=self._load, daemon=True).start()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Cover-URLs enthalten den Port, ein alter Snapshot mit anderem Port ist wertlos
+            if data.get("version") == self.VERSION and data.get("port") == MEDIA_PORT:
+                self._data = data
+        except (OSError, ValueError, AttributeError):
+            pass
+        finally:
+            self._loaded.set()
+
+    def get(self, root, timeout=5):
+        """Entries for root, or None if the snapshot belongs to another folder (or is missing)."""
+        if not self._started:
+            self._started = True
+            self._load()
+        self._loaded.wait(timeout)
+        data = self._data
+        return data["items"] if data and data.get("root") == root else None
+
+    def save(self, root, items):
+        data = {"version": self.VERSION, "root": root, "port": MEDIA_PORT, "items": items}
+        try:
+            write_json_atomic(self.path, data)
+        except OSError:
+            return
+        self._data = data
+        self._started = True
+        self._loaded.set()
+
+library_snapshot = LibrarySnapshot(LIBRARY_SNAPSHOT_FILE)
+
+# --- COVER THUMBNAIL CACHE ---
+class CoverCache:
+    """On-disk cache of downscaled covers with LRU eviction by total size."""
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_dir(self):
+        if self._total is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._total = sum(f.stat().st_size for f in self.cache_dir.glob("*.img"))
+
+    def get(self, key, size, path_str):
+        """Returns (mime, bytes) for the cover of path_str scaled to size, building it on a miss."""
+        target = self.cache_dir / f"{key}-{size}.img"
+        with self._lock:
+            self._ensure_dir()
+            if target.exists():
+                try:
+                    os.utime(target)  # LRU: Zugriffszeit auffrischen
+                    data = target.read_bytes()
+                    self.hits += 1
+                    return self._sniff_mime(data), data
+                except OSError:
+                    pass
+            self.misses += 1
+
+        cover = extract_cover(path_str)
+        if not cover: return None
+        mime, data = self._scale(cover[0], cover[1], size)
+
+        with self._lock:
+            try:
+                tmp = target.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, target)
+                self._total += len(data)
+                if self._total > self.max_bytes:
+                    self._evict()
+            except OSError:
+                pass
+        return mime, data
+
+    def _scale(self, mime, data, size):
+        """Downscales the cover to a JPEG thumbnail; without Pillow the original bytes are kept."""
+        try:
+            from PIL import Image
+        except ImportError:
+            return mime, data
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.thumbnail((size, size))
+            out = io.BytesIO()
+            img.convert("RGB").save(out, format="JPEG", quality=85)
+            return "image/jpeg", out.getvalue()
+        except Exception:
+            return mime, data
+
+    def _sniff_mime(self, data):
+        if data.startswith(b"\x89PNG"): return "image/png"
+        if data[8:12] == b"WEBP": return "image/webp"
+        return "image/jpeg"
+
+    def _evict(self):
+        """Deletes the least recently used thumbnails until the cache is below 80% of its limit."""
+        files = []
+        for f in self.cache_dir.glob("*.img"):
+            try:
+                st = f.stat()
+                files.append((st.st_mtime, st.st_size, f))
+            except OSError:
+                pass
+        files.sort()
+        self._total = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if self._total <= self.max_bytes * 0.8: break
+            try:
+                f.unlink()
+                self._total -= size
+            except OSError:
+                pass
+
+cover_cache = CoverCache(COVER_CACHE_DIR, COVER_CACHE_MAX_BYTES)
+
+# --- WAVEFORM PEAKS ---
+def ffmpeg_binary():
+    """The bundled ffmpeg.exe if present, otherwise ffmpeg from PATH."""
+    return FFMPEG_PATH if os.path.isfile(FFMPEG_PATH) else shutil.which("ffmpeg")
+
+class WaveformService:
+    """Decodes tracks with ffmpeg in the background and caches their min/max peak envelope.
+
+    A cached waveform is `bins` interleaved (min, max) uint8 pairs, 128 being silence, stored
+    under a key of path, size and mtime. Requests go into a priority queue (current track
+    before next track before everything else) served by a small pool of daemon threads;
+    ffmpeg itself runs at reduced OS priority so decoding never competes with playback.
+    """
+    PRIO_CURRENT, PRIO_NEXT, PRIO_BACKGROUND = 0, 1, 2
+
+    def __init__(self, cache_dir, bins=WAVEFORM_BINS, workers=WAVEFORM_WORKERS,
+                 max_queue=WAVEFORM_QUEUE_MAX, on_ready=None):
+        self.cache_dir = Path(cache_dir)
+        self.bins = bins
+        self.workers = workers
+        self.max_queue = max_queue
+        self.on_ready = on_ready
+        self._cond = threading.Condition()
+        self._heap = []
+        self._queued = {}     # path -> aktuelle Priorität (ältere Heap-Einträge sind veraltet)
+        self._running = set()
+        self._focus = []
+        self._seq = 0
+        self._threads = []
+
+    @staticmethod
+    def available():
+        # numpy ist optional und wird erst in compute() importiert
+        return importlib.util.find_spec("numpy") is not None and ffmpeg_binary() is not None
+
+    def key(self, path_str):
+        st = os.stat(path_str)
+        return hashlib.sha1(f"{path_str}|{st.st_size}|{st.st_mtime_ns}|{self.bins}".encode('utf-8')).hexdigest()
+
+    def cached(self, path_str):
+        """Returns (key, peaks) if the waveform is on disk, else (key, None)."""
+        key = self.key(path_str)
+        try:
+            return key, (self.cache_dir / f"{key}.peaks").read_bytes()
+        except OSError:
+            return key, None
+
+    def focus(self, current, upcoming=()):
+        """Moves the playing track and the next ones to the front; the previous focus is demoted."""
+        with self._cond:
+            wanted = [p for p in [current, *upcoming] if p]
+            for path in self._focus:
+                if path not in wanted and path in self._queued:
+                    self._seq += 1
+                    self._queued[path] = self.PRIO_BACKGROUND
+                    heapq.heappush(self._heap, (self.PRIO_BACKGROUND, self._seq, path))
+            self._focus = wanted
+            for i, path in enumerate(wanted):
+                self._push(path, self.PRIO_CURRENT if i == 0 else self.PRIO_NEXT)
+
+    def request(self, path_str, priority=PRIO_BACKGROUND):
+        with self._cond:
+            self._push(path_str, priority)
+
+    def _push(self, path, priority):
+        if path in self._running: return
+        if self._queued.get(path, priority + 1) <= priority: return
+        if priority == self.PRIO_BACKGROUND and len(self._queued) >= self.max_queue: return
+        self._seq += 1
+        self._queued[path] = priority
+        heapq.heappush(self._heap, (priority, self._seq, path))
+        if len(self._threads) < self.workers:
+            t = threading.Thread(target=self._worker, daemon=True)
+            self._threads.append(t)
+            t.start()
+        self._cond.notify()
+
+    def _next(self):
+        with self._cond:
+            while True:
+                while self._heap:
+                    priority, _, path = heapq.heappop(self._heap)
+                    if self._queued.get(path) == priority:
+                        del self._queued[path]
+                        self._running.add(path)
+                        return path
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            path = self._next()
+            try:
+                key, peaks = self.cached(path)
+                if peaks is None:
+                    peaks = self.compute(path)
+                    if peaks is not None:
+                        self._store(key, peaks)
+                if peaks is not None and self.on_ready:
+                    self.on_ready(path)
+            except Exception:
+                pass
+            finally:
+                with self._cond:
+                    self._running.discard(path)
+
+    def compute(self, path_str):
+        """Decodes to mono 16-bit PCM and reduces it to min/max per bin in one vectorized pass."""
+        if not self.available(): return None
+        import numpy as np
+        cmd = [ffmpeg_binary(), "-v", "error", "-nostdin", "-threads", "1", "-i", path_str,
+               "-vn", "-ac", "1", "-ar", str(WAVEFORM_SAMPLE_RATE), "-f", "s16le", "-"]
+        kwargs = {}
+        if platform.system() == "Windows":
+            kwargs["creationflags"] = subprocess.BELOW_NORMAL_PRIORITY_CLASS | subprocess.CREATE_NO_WINDOW
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **kwargs)
+        # kein preexec_fn (im multithreaded Prozess deadlock-gefährdet): Priorität erst nach dem Start senken
+        if hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, proc.pid, 10)
+            except OSError:
+                pass
+        try:
+            stdout, _ = proc.communicate(timeout=WAVEFORM_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return None
+        samples = np.frombuffer(stdout, dtype='<i2')
+        if samples.size == 0: return None
+        bins = min(self.bins, samples.size)
+        per_bin = -(-samples.size // bins)
+        padded = np.zeros(bins * per_bin, dtype=np.int16)
+        padded[:samples.size] = samples
+        frames = padded.reshape(bins, per_bin)
+        peaks = np.empty((bins, 2), dtype=np.int16)
+        frames.min(axis=1, out=peaks[:, 0])
+        frames.max(axis=1, out=peaks[:, 1])
+        # -32768..32767 -> 0..255, 128 = Stille
+        return ((peaks.astype(np.int32) + 32768) >> 8).astype(np.uint8).tobytes()
+
+    def _store(self, key, peaks):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        target = self.cache_dir / f"{key}.peaks"
+        tmp = target.with_name(f".{key}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(peaks)
+            os.replace(tmp, target)
+        except OSError:
+            try: tmp.unlink()
+            except OSError: pass
+
+def _waveform_ready(path_str):
+    if window:
+        try:
+            window.evaluate_js(f"onWaveformReady({json.dumps(path_str)})")
+        except:
+            pass
+
+waveform_service = WaveformService(WAVEFORM_CACHE_DIR, on_ready=_waveform_ready)
+
+# --- IMAGE STORE ---
+class ImageStore:
+    """Content-addressed store for user-supplied images, served by the media server.
+
+    JSON files keep a short 'image:<sha1>.<ext>' reference instead of a base64 data URL;
+    the frontend gets http URLs to /image.
+    """
+    PREFIX = "image:"
+    NAME_RE = re.compile(r'^[0-9a-f]{40}\.(png|jpg|webp|gif)$')
+    EXTS = {'image/png': '.png', 'image/jpeg': '.jpg', 'image/webp': '.webp', 'image/gif': '.gif'}
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def put(self, data, mime='image/png'):
+        """Stores the bytes (once per content) and returns the reference."""
+        name = hashlib.sha1(data).hexdigest() + self.EXTS.get(mime.lower(), '.png')
+        path = self.root / name
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return self.PREFIX + name
+
+    def put_file(self, file_path):
+        ext = os.path.splitext(file_path)[1].lower().replace('.jpeg', '.jpg')
+        with open(file_path, 'rb') as f:
+            return self.put(f.read(), IMAGE_TYPES.get(ext, 'image/png'))
+
+    def url_prefix(self):
+        return f"http://127.0.0.1:{MEDIA_PORT}/image?id="
+
+    def to_ref(self, value):
+        """Normalizes a value coming from the frontend: data URLs and /image URLs become references."""
+        if not isinstance(value, str): return value
+        if value.startswith('data:image/') and ';base64,' in value:
+            header, _, payload = value.partition(';base64,')
+            try:
+                return self.put(base64.b64decode(payload), header[5:])
+            except (ValueError, OSError):
+                return value
+        if value.startswith(self.url_prefix()):
+            return self.PREFIX + value[len(self.url_prefix()):]
+        return value
+
+    def to_url(self, value):
+        if isinstance(value, str) and value.startswith(self.PREFIX):
+            return self.url_prefix() + value[len(self.PREFIX):]
+        return value
+
+    def path(self, name):
+        if not name or not self.NAME_RE.match(name): return None
+        path = self.root / name
+        return path if path.is_file() else None
+
+image_store = ImageStore(IMAGE_STORE_DIR)
+
+# --- STATION REGISTRY ---
+class StationRegistry:
+    """In-memory view of stations_config.json, indexed by URL and name.
+
+    The file is re-read only when its mtime changes; writes go through a temp file and
+    a rename. Base64 images found in the file are moved into the image store.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._stations = []
+        self._by_url = {}
+        self._by_name = {}
+
+    def _refresh(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime == self._mtime: return
+        if mtime is None:
+            stations = [dict(s) for s in DEFAULT_STATIONS]
+            try:
+                self._write(stations)
+            except OSError:
+                self._set(stations, None)
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stations = json.load(f)
+        except (OSError, ValueError):
+            stations = [dict(s) for s in DEFAULT_STATIONS]
+        migrated = False
+        for s in stations:
+            image = image_store.to_ref(s.get("image"))
+            if image != s.get("image"):
+                s["image"] = image
+                migrated = True
+        if migrated:
+            try:
+                self._write(stations)
+                return
+            except OSError:
+                pass
+        self._set(stations, mtime)
+
+    def _set(self, stations, mtime):
+        self._stations = stations
+        self._mtime = mtime
+        self._by_url = {s.get("url"): s for s in stations}
+        self._by_name = {s.get("name"): s for s in stations}
+
+    def _write(self, stations):
+        write_json_atomic(self.path, stations, indent=4)
+        self._set(stations, self.path.stat().st_mtime_ns)
+
+    def all(self):
+        """Stations for the frontend (image references resolved to media server URLs)."""
+        with self._lock:
+            self._refresh()
+            return [dict(s, image=image_store.to_url(s.get("image", ""))) for s in self._stations]
+
+    def find(self, url=None, name=None):
+        with self._lock:
+            self._refresh()
+            return self._by_url.get(url) or self._by_name.get(name)
+
+    def save(self, stations):
+        stations = [dict(s, image=image_store.to_ref(s.get("image", ""))) for s in stations]
+        with self._lock:
+            self._write(stations)
+
+    @staticmethod
+    def presence_image(station):
+        """Discord can only show public http(s) images; local ones fall back to the app logo."""
+        image = (station or {}).get("image") or ""
+        return image if image.startswith(("http://", "https://")) else "app_logo"
+
+station_registry = StationRegistry(STATIONS_FILE)
+
+# --- FAVOURITES STORE ---
+class FavouritesStore:
+    """Favourite playlists as a JSON snapshot plus an append-only journal of operations.
+
+    Every change is one fsynced JSON line in the journal, so adding a track writes a few
+    dozen bytes instead of the whole collection. The snapshot is rewritten atomically on
+    load and after FAV_COMPACT_OPS entries. Operations are idempotent, so replaying a
+    journal that was already folded into the snapshot (crash between rename and truncate)
+    is harmless; replay stops at the first torn or malformed line. Cover images live in the image store.
+    """
+    def __init__(self, path, journal_path, compact_ops=FAV_COMPACT_OPS):
+        self.path = path
+        self.journal_path = journal_path
+        self.compact_ops = compact_ops
+        self._lock = threading.Lock()
+        self._favs = None
+        self._journal = None
+        self._pending = 0
+
+    def _load(self):
+        if self._favs is not None: return
+        favs = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                favs = json.load(f)
+        except (OSError, ValueError):
+            pass
+        dirty = False
+        for fav in favs:
+            image = image_store.to_ref(fav.get("image"))
+            if image != fav.get("image"):
+                fav["image"] = image
+                dirty = True
+            fav.setdefault("tracks", [])
+        self._favs = favs
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        # torn oder kaputte Zeile (z. B. '[]' oder fehlendes Feld): wie beim
+                        # abgebrochenen Schreiben hier aufhören, sonst startet die App nicht mehr
+                        break
+                    dirty = True
+        except OSError:
+            pass
+        if dirty:
+            try:
+                self._compact()
+            except OSError:
+                pass
+
+    def _find(self, fav_id):
+        for fav in self._favs:
+            if fav.get("id") == fav_id: return fav
+        return None
+
+    def _apply(self, op):
+        """Applies one journal entry to the in-memory list; returns False if it changed nothing."""
+        kind = op.get("op")
+        if kind == "create":
+            if self._find(op["id"]): return False
+            self._favs.append({"id": op["id"], "name": op["name"], "image": op.get("image"), "tracks": []})
+            return True
+        fav = self._find(op.get("id"))
+        if fav is None: return False
+        if kind == "delete":
+            self._favs.remove(fav)
+        elif kind == "rename":
+            if fav["name"] == op["name"]: return False
+            fav["name"] = op["name"]
+        elif kind == "image":
+            if fav.get("image") == op["image"]: return False
+            fav["image"] = op["image"]
+        elif kind == "add":
+            if op["path"] in fav["tracks"]: return False
+            fav["tracks"].append(op["path"])
+        elif kind == "remove":
+            if op["path"] not in fav["tracks"]: return False
+            fav["tracks"].remove(op["path"])
+        elif kind == "move":
+            tracks = fav["tracks"]
+            if op["path"] not in tracks: return False
+            index = max(0, min(int(op["index"]), len(tracks) - 1))
+            if tracks.index(op["path"]) == index: return False
+            tracks.remove(op["path"])
+            tracks.insert(index, op["path"])
+        else:
+            return False
+        return True
+
+    def _commit(self, op):
+        """Applies an operation and appends it to the journal (durable before returning)."""
+        self._load()
+        if not self._apply(op): return False
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(op, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending += 1
+        if self._pending >= self.compact_ops:
+            self._compact()
+        return True
+
+    def _compact(self):
+        write_json_atomic(self.path, self._favs, indent=4)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        with open(self.journal_path, 'w', encoding='utf-8'):
+            pass
+        self._pending = 0
+
+    @staticmethod
+    def _public(fav):
+        return dict(fav, image=image_store.to_url(fav.get("image")), tracks=list(fav["tracks"]))
+
+    def all(self):
+        """Favourites for the frontend (image references resolved to media server URLs)."""
+        with self._lock:
+            self._load()
+            return [self._public(f) for f in self._favs]
+
+    def get(self, fav_id):
+        with self._lock:
+            self._load()
+            fav = self._find(fav_id)
+            return self._public(fav) if fav else None
+
+    def create(self, name, image=None, fav_id=None):
+        with self._lock:
+            self._load()
+            fav_id = fav_id or int(time.time() * 1000)
+            while self._find(fav_id): fav_id += 1
+            self._commit({"op": "create", "id": fav_id, "name": name, "image": image_store.to_ref(image)})
+            return self._public(self._find(fav_id))
+
+    def update(self, op, **fields):
+        """Runs a rename/image/delete/add/remove/move operation; False if nothing changed."""
+        if "image" in fields: fields["image"] = image_store.to_ref(fields["image"])
+        with self._lock:
+            return self._commit(dict(op=op, **fields))
+
+    def replace(self, favs):
+        """Replaces the whole collection (old save_favourites_list behaviour)."""
+        favs = [dict(f, image=image_store.to_ref(f.get("image")), tracks=list(f.get("tracks") or []))
+                for f in favs]
+        with self._lock:
+            self._favs = favs
+            self._compact()
+
+favourites_store = FavouritesStore(FAV_FILE, FAV_JOURNAL_FILE)
+
+# --- METRICS ---
+# Prometheus-Text unter /metrics; auf den heißen Pfaden nur ein paar Zähler pro Request,
+# alles Weitere (Cache-Treffer, Discord-Statistik, Warteschlangen) wird beim Scrapen gelesen.
+METRIC_ROUTES = ('/media', '/cover', '/image', '/waveform', '/metrics')
+
+http_requests = metrics.registry.counter(
+    "inferno_http_requests_total", "Media server requests by route and status code", ("route", "code"))
+http_seconds = metrics.registry.histogram(
+    "inferno_http_request_duration_seconds", "Media server request duration including the body", ("route",))
+http_bytes = metrics.registry.counter(
+    "inferno_http_response_bytes_total", "Body bytes of completed media server responses", ("route",))
+scan_seconds = metrics.registry.histogram(
+    "inferno_library_scan_duration_seconds", "Duration of completed library scans", ("kind",),
+    metrics.DURATION_BUCKETS)
+scan_files = metrics.registry.counter(
+    "inferno_library_scan_files_total", "Media files seen by library scans", ("kind",))
+scan_extracted = metrics.registry.counter(
+    "inferno_library_scan_extracted_total", "New or changed files whose tags were read during scans", ("kind",))
+last_scan_rate = {}
+metrics.registry.gauge_func(
+    "inferno_library_scan_files_per_second", "Files per second of the last completed scan",
+    lambda: dict(last_scan_rate), ("kind",))
+metrics.registry.counter_func(
+    "inferno_cover_thumbnail_cache_total", "Cover thumbnail cache lookups by result",
+    lambda: {"hit": cover_cache.hits, "miss": cover_cache.misses}, ("result",))
+metrics.registry.gauge_func(
+    "inferno_waveform_queue", "Tracks waiting for waveform peaks", lambda: len(waveform_service._queued))
+
+def record_scan(kind, seconds, files, extracted):
+    scan_seconds.observe(seconds, kind)
+    scan_files.inc(kind, amount=files)
+    scan_extracted.inc(kind, amount=extracted)
+    if seconds > 0: last_scan_rate[kind] = round(files / seconds, 1)
 
 # --- MEDIA SERVER ---
 class MediaHandler(SimpleHTTPRequestHandler):
     """Handles local file streaming with support for Range requests."""
+    # Keep-Alive: der <audio>/<video> Tag nutzt beim Spulen dieselbe Verbindung weiter
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+
+    def handle_one_request(self):
+        self._status = None
+        self._body_bytes = 0
+        start = time.perf_counter()
+        super().handle_one_request()
+        if self._status is None: return   # Verbindung ohne (weiteren) Request geschlossen
+        route = urllib.parse.urlparse(getattr(self, 'path', '')).path
+        if route not in METRIC_ROUTES: route = 'other'
+        http_requests.inc(route, str(self._status))
+        http_seconds.observe(time.perf_counter() - start, route)
+        if self._body_bytes: http_bytes.inc(route, amount=self._body_bytes)
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword == 'Content-Length' and self.command != 'HEAD':
+            self._body_bytes = int(value)
+        super().send_header(keyword, value)
+
     def do_GET(self):
         parsed_url = urllib.parse.urlparse(self.path)
+        if parsed_url.path == '/metrics':
+            self._send_metrics()
+            return
+        if parsed_url.path == '/cover':
+            self._send_cover(urllib.parse.parse_qs(parsed_url.query))
+            return
+        if parsed_url.path == '/image':
+            self._send_image(urllib.parse.parse_qs(parsed_url.query))
+            return
+        if parsed_url.path == '/waveform':
+            self._send_waveform(urllib.parse.parse_qs(parsed_url.query))
+            return
         if parsed_url.path == '/media':
             params = urllib.parse.parse_qs(parsed_url.query)
             file_path = params.get('path', [None])[0]
-            if file_path and os.path.exists(file_path):
-                file_size = os.path.getsize(file_path)
-                range_header = self.headers.get('Range', None)
-                byte_start = 0
-                byte_end = file_size - 1
-                if range_header:
-                    range_match = range_header.strip().split('=')[-1]
-                    parts = range_match.split('-')
-                    if parts[0]: byte_start = int(parts[0])
-                    if parts[1]: byte_end = int(parts[1])
-                    self.send_response(206)
-                    self.send_header('Content-Range', f'bytes {byte_start}-{byte_end}/{file_size}')
-                else:
-                    self.send_response(200)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Content-Type', 'audio/mpeg' if file_path.endswith('.mp3') else 'video/mp4')
-                self.send_header('Content-Length', str(byte_end - byte_start + 1))
-                self.send_header('Accept-Ranges', 'bytes')
-                self.end_headers()
-                with open(file_path, 'rb') as f:
-                    f.seek(byte_start)
-                    self.wfile.write(f.read(byte_end - byte_start + 1))
+            if file_path and os.path.isfile(file_path):
+                self._send_media(file_path)
+                return
+        self.send_error(404)
+
+    def do_HEAD(self):
+        parsed_url = urllib.parse.urlparse(self.path)
+        if parsed_url.path == '/media':
+            params = urllib.parse.parse_qs(parsed_url.query)
+            file_path = params.get('path', [None])[0]
+            if file_path and os.path.isfile(file_path):
+                self._send_media(file_path, head_only=True)
                 return
         self.send_error(404)
+
+    def _not_modified(self, etag, mtime):
+        """Evaluates If-None-Match / If-Modified-Since against the file validators."""
+        inm = self.headers.get('If-None-Match')
+        if inm is not None:
+            tags = [t.strip() for t in inm.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+        ims = self.headers.get('If-Modified-Since')
+        if ims:
+            try:
+                return int(mtime) <= email.utils.parsedate_to_datetime(ims).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _range_allowed(self, etag, last_modified):
+        """If-Range: only honour Range when the client's validator still matches."""
+        if_range = self.headers.get('If-Range')
+        if not if_range: return True
+        if_range = if_range.strip()
+        if if_range.startswith('"'): return if_range == etag
+        return if_range == last_modified
+
+    def _send_media(self, file_path, head_only=False):
+        """Streams a file (or one byte range of it) with constant memory per connection."""
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            file_size = st.st_size
+            etag = f'"{file_size:x}-{st.st_mtime_ns:x}"'
+            last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+            if self._not_modified(etag, st.st_mtime):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', last_modified)
+                self.end_headers()
+                return
+            range_header = self.headers.get('Range') if self._range_allowed(etag, last_modified) else None
+            try:
+                byte_range = parse_byte_range(range_header, file_size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{file_size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range:
+                byte_start, byte_end = byte_range
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {byte_start}-{byte_end}/{file_size}')
+            else:
+                byte_start, byte_end = 0, file_size - 1
+                self.send_response(200)
+            length = byte_end - byte_start + 1
+            content_type = MEDIA_TYPES.get(os.path.splitext(file_path)[1].lower(), 'application/octet-stream')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            if head_only: return
+            try:
+                self._copy_range(f, byte_start, length)
+            except (ConnectionError, TimeoutError):
+                # Der Player bricht beim Spulen laufende Requests ab
+                self.close_connection = True
+                self._body_bytes = 0
+
+    def _copy_range(self, f, offset, count):
+        """Sends count bytes from offset, zero-copy via sendfile where the OS supports it."""
+        if count <= 0: return
+        try:
+            self.connection.sendfile(f, offset, count)
+            return
+        except (AttributeError, NotImplementedError, ValueError):
+            pass
+        f.seek(offset)
+        remaining = count
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk: break
+            self.wfile.write(chunk)
+            remaining -= len(chunk)
+
+    def _send_cover(self, params):
+        """Serves a lazily extracted, cached cover thumbnail for a library track."""
+        try:
+            track_id = int(params.get('id', ['0'])[0])
+            size = max(16, min(int(params.get('size', [COVER_THUMB_SIZE])[0]), 1024))
+        except ValueError:
+            self.send_error(400)
+            return
+        row = library_index.lookup(track_id)
+        if not row:
+            self.send_error(404)
+            return
+        path_str, file_size, mtime = row
+        key = cover_key(path_str, file_size, mtime)
+        etag = f'"{key[:16]}-{size}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        cover = cover_cache.get(key, size, path_str)
+        if not cover:
+            self.send_error(404)
+            return
+        mime, data = cover
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', mime)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'public, max-age=86400')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_image(self, params):
+        """Serves an image from the content-addressed store; names never change content."""
+        name = params.get('id', [''])[0]
+        path = image_store.path(name)
+        if not path:
+            self.send_error(404)
+            return
+        etag = f'"{name}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        data = path.read_bytes()
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', IMAGE_TYPES.get(path.suffix, 'image/png'))
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_waveform(self, params):
+        """Serves cached min/max peaks as raw bytes; 202 while the waveform is still being computed."""
+        path_str = params.get('path', [None])[0]
+        if not path_str or not os.path.isfile(path_str) or not waveform_service.available():
+            self.send_error(404)
+            return
+        key, peaks = waveform_service.cached(path_str)
+        etag = f'"{key[:16]}"'
+        if peaks is None:
+            waveform_service.request(path_str, WaveformService.PRIO_CURRENT)
+            self.send_response(202)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(peaks)))
+        # URL hängt nur am Pfad, nicht am Inhalt: immer per ETag revalidieren (304 kostet fast nichts)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(peaks)
+
+    def _send_metrics(self):
+        body = metrics.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', metrics.CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
     def log_message(self, format, *args): pass
 
 def start_server():
@@ -198,6 +1277,940 @@ def start_server():
     server = ThreadingHTTPServer(('127.0.0.1', MEDIA_PORT), MediaHandler)
     server.serve_forever()
 
+# --- METADATA EXTRACTION ENGINE ---
+class MetadataExtractor:
+    """Runs tag extraction for scans on a process pool (or threads), chunked per worker to amortize IPC."""
+    SMALL_JOB = 32  # kleine Jobs (Watcher-Deltas) lohnen keinen Prozess-Roundtrip
+
+    def __init__(self, engine="process", workers=0):
+        self.engine = engine if engine in ("process", "thread") else "process"
+        self.workers = int(workers) if workers else (os.cpu_count() or 4)
+        self._pool = None
+        self._threads = ThreadPoolExecutor(max_workers=8)
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self.engine == "thread":
+                return self._threads
+            if self._pool is None:
+                try:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                except (OSError, NotImplementedError, ValueError):
+                    self.engine = "thread"
+                    return self._threads
+            return self._pool
+
+    def chunk_size(self, total=None):
+        """Splits a job into ~4 chunks per worker, between 16 and 256 files each (64 if the size is unknown)."""
+        if not total: return 64
+        return max(16, min(256, -(-total // (self.workers * 4))))
+
+    def submit(self, paths, local=False):
+        """Submits one chunk; the future resolves to a list of scan records."""
+        executor = self._threads if local else self._executor()
+        try:
+            return executor.submit(scan_records, paths)
+        except (BrokenProcessPool, RuntimeError):
+            with self._lock:
+                self.engine = "thread"
+            return self._threads.submit(scan_records, paths)
+
+    def result(self, future, paths):
+        """Returns the records of a finished chunk, re-running it locally if a worker died."""
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            with self._lock:
+                self.engine = "thread"
+                self._pool = None
+            return scan_records(paths)
+        except Exception:
+            return []
+
+    def extract(self, paths):
+        """Yields record lists as chunks complete."""
+        if not paths: return
+        local = len(paths) < self.SMALL_JOB
+        size = self.chunk_size(len(paths))
+        chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+        futures = {self.submit(chunk, local): chunk for chunk in chunks}
+        for fut in as_completed(futures):
+            yield self.result(fut, futures[fut])
+
+# --- LIBRARY INDEX ---
+def is_media_file(name):
+    """True for supported media files, ignoring ffmpeg/yt-dlp temp outputs like 'x.temp.mp3'."""
+    lower = name.lower()
+    return lower.endswith(MEDIA_EXTS) and '.temp.' not in lower
+
+def list_media_dir(path):
+    """Non-recursive listing: returns ({file: (size, mtime_ns)}, [subdirs])."""
+    files, subdirs = {}, []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif is_media_file(entry.name):
+                        st = entry.stat()
+                        files[entry.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return files, subdirs
+
+def iter_media_files(root):
+    """Walks the folder with os.scandir and yields (path, (size, mtime_ns)) for every media file."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif is_media_file(entry.name):
+                            st = entry.stat()
+                            yield entry.path, (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+def walk_media_files(root):
+    """Returns {path: (size, mtime_ns)} for every media file below root."""
+    return dict(iter_media_files(root))
+
+class LibraryIndex:
+    """Persistent SQLite metadata cache, keyed by path and validated by size/mtime."""
+    SCHEMA_VERSION = 3
+    COLUMNS = ("path", "size", "mtime", "name", "artist", "album", "duration", "has_cover", "filename", "source_id")
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+        self.listeners = []  # callbacks(upserted_paths, removed_paths), e.g. the search index
+
+    def _notify(self, upserted, removed):
+        for callback in self.listeners:
+            try: callback(upserted, removed)
+            except Exception: pass
+
+    def _db(self):
+        """Opens the database lazily and resets it if the schema version changed."""
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS tracks")
+                conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tracks ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, name TEXT, artist TEXT, "
+                "album TEXT, duration REAL, has_cover INTEGER, filename TEXT, source_id TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tracks_name ON tracks(name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tracks_source ON tracks(source_id)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def stamps(self):
+        """Returns {path: (size, mtime_ns)} for every indexed file."""
+        with self._lock:
+            rows = self._db().execute("SELECT path, size, mtime FROM tracks").fetchall()
+        return {path: (size, mtime) for path, size, mtime in rows}
+
+    def upsert(self, items):
+        """Stores scan records; items is a list of (record, (size, mtime_ns)), see scan_record()."""
+        if not items: return
+        rows = [(rec[0], st[0], st[1]) + tuple(rec[1:]) for rec, st in items]
+        with self._lock:
+            db = self._db()
+            db.executemany(f"INSERT OR REPLACE INTO tracks VALUES ({','.join('?' * len(self.COLUMNS))})", rows)
+            db.commit()
+        self._notify([row[0] for row in rows], [])
+
+    def remove(self, paths):
+        """Drops files that no longer exist on disk."""
+        if not paths: return
+        with self._lock:
+            db = self._db()
+            db.executemany("DELETE FROM tracks WHERE path = ?", [(p,) for p in paths])
+            db.commit()
+        self._notify([], list(paths))
+
+    ENTRY_SQL = "SELECT rowid, path, name, artist, album, has_cover, duration, filename, size, mtime FROM tracks"
+
+    @staticmethod
+    def _entry(row):
+        rowid, path, name, artist, album, has_cover, duration, filename, size, mtime = row
+        cover = cover_url(rowid, cover_key(path, size, mtime)) if has_cover else ""
+        return {"name": name, "artist": artist, "album": album, "path": path,
+                "cover": cover, "duration": duration, "filename": filename}
+
+    def entries(self, paths):
+        """Returns the playlist entries for the given set of paths; covers are short /cover URLs."""
+        with self._lock:
+            db = self._db()
+            if len(paths) > 2000:
+                rows = [row for row in db.execute(self.ENTRY_SQL) if row[1] in paths]
+            else:
+                paths = list(paths)
+                rows = []
+                for i in range(0, len(paths), 500):
+                    part = paths[i:i + 500]
+                    rows.extend(db.execute(
+                        f"{self.ENTRY_SQL} WHERE path IN ({','.join('?' * len(part))})", part
+                    ).fetchall())
+        return [self._entry(row) for row in rows]
+
+    def all_entries(self):
+        """Returns every indexed entry (used to build in-memory indexes)."""
+        with self._lock:
+            rows = self._db().execute(self.ENTRY_SQL).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def entries_under(self, prefix):
+        """Returns all indexed entries whose path starts with prefix, sorted by name."""
+        with self._lock:
+            rows = self._db().execute(
+                f"{self.ENTRY_SQL} WHERE substr(path, 1, ?) = ? ORDER BY name, path", (len(prefix), prefix)
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def lookup(self, track_id):
+        """Returns (path, size, mtime_ns) for a track id or None."""
+        with self._lock:
+            return self._db().execute(
+                "SELECT path, size, mtime FROM tracks WHERE rowid = ?", (track_id,)
+            ).fetchone()
+
+    def identities(self):
+        """Returns (name, artist, duration, source_id) of every track, used to skip known imports."""
+        with self._lock:
+            return self._db().execute("SELECT name, artist, duration, source_id FROM tracks").fetchall()
+
+    def id_for_path(self, path_str):
+        """Returns the track id of an indexed file or None."""
+        with self._lock:
+            row = self._db().execute("SELECT rowid FROM tracks WHERE path = ?", (path_str,)).fetchone()
+        return row[0] if row else None
+
+library_index = LibraryIndex(LIBRARY_DB)
+
+# --- SEARCH INDEX ---
+def normalize_text(text):
+    """Lowercases and strips accents so 'Beyoncé' matches 'beyonce'."""
+    text = unicodedata.normalize("NFKD", str(text or "")).casefold()
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+class SearchIndex:
+    """In-memory n-gram index over title/artist/album/filename, kept in sync with the library index."""
+    WEIGHTS = (8, 4, 2, 1)  # title, artist, album, filename
+
+    def __init__(self, library):
+        self.library = library
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._ids = {}    # path -> doc id
+        self._docs = {}   # doc id -> (fields, entry)
+        self._grams = {}  # gram -> set(doc ids)
+        self._next_id = 0
+        library.listeners.append(self._on_change)
+
+    @staticmethod
+    def _doc_grams(fields):
+        """Bigrams/trigrams of every word plus a ' x' gram for each word start."""
+        grams = set()
+        for field in fields:
+            for word in field.split():
+                padded = " " + word
+                for n in (2, 3):
+                    for i in range(len(padded) - n + 1):
+                        grams.add(padded[i:i + n])
+        return grams
+
+    @staticmethod
+    def _term_grams(term):
+        if len(term) == 1: return {" " + term}
+        if len(term) == 2: return {term}
+        return {term[i:i + 3] for i in range(len(term) - 2)}
+
+    def _add(self, entry):
+        fields = tuple(normalize_text(entry.get(key)) for key in ("name", "artist", "album", "filename"))
+        doc_id = self._next_id
+        self._next_id += 1
+        self._ids[entry["path"]] = doc_id
+        self._docs[doc_id] = (fields, entry)
+        for gram in self._doc_grams(fields):
+            self._grams.setdefault(gram, set()).add(doc_id)
+
+    def _remove(self, path):
+        doc_id = self._ids.pop(path, None)
+        if doc_id is None: return
+        fields, _ = self._docs.pop(doc_id)
+        for gram in self._doc_grams(fields):
+            postings = self._grams.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings: del self._grams[gram]
+
+    def ensure_loaded(self):
+        """Builds the index from the library database on first use."""
+        with self._lock:
+            if self._loaded: return
+            for entry in self.library.all_entries():
+                self._add(entry)
+            self._loaded = True
+
+    def _on_change(self, upserted, removed):
+        with self._lock:
+            if not self._loaded: return
+            for path in removed: self._remove(path)
+            if upserted:
+                for path in upserted: self._remove(path)
+                for entry in self.library.entries(set(upserted)): self._add(entry)
+
+    @staticmethod
+    def _score(term, fields):
+        score = 0
+        for field, weight in zip(fields, SearchIndex.WEIGHTS):
+            if not field: continue
+            if field == term: score += 10 * weight
+            elif field.startswith(term): score += 6 * weight
+            elif (" " + term) in field: score += 4 * weight
+            elif len(term) > 1 and term in field: score += 2 * weight
+        return score
+
+    def search(self, query, limit=200, prefix=None):
+        """Returns up to limit entries ranked by match quality; every query word must match."""
+        terms = normalize_text(query).split()
+        if not terms: return []
+        self.ensure_loaded()
+        with self._lock:
+            candidates = None
+            for term in terms:
+                postings = [self._grams.get(g, set()) for g in self._term_grams(term)]
+                postings.sort(key=len)
+                matched = set(postings[0]) if postings else set()
+                for p in postings[1:]:
+                    matched &= p
+                    if not matched: break
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates: return []
+            # Erst Dokumente, in denen ein Wort mit dem Suchbegriff beginnt (höchste Ränge), der Rest nur bei Bedarf
+            strong = candidates
+            for term in terms:
+                strong = strong & self._grams.get(" " + term[:2], set())
+            ranked = self._rank(strong, terms, prefix)
+            if len(ranked) < limit:
+                ranked += self._rank(candidates - strong, terms, prefix)
+        return [entry for _, _, entry in heapq.nsmallest(limit, ranked, key=lambda r: (r[0], r[1]))]
+
+    def _rank(self, doc_ids, terms, prefix):
+        ranked = []
+        for doc_id in doc_ids:
+            fields, entry = self._docs[doc_id]
+            if prefix and not entry["path"].startswith(prefix): continue
+            total = 0
+            for term in terms:
+                score = self._score(term, fields)
+                if not score: break
+                total += score
+            else:
+                ranked.append((-total, fields[0], entry))
+        return ranked
+
+search_index = SearchIndex(library_index)
+
+# --- FOLDER WATCHER ---
+class InotifyBackend:
+    """Minimal ctypes inotify binding (Linux) that reports which directories changed."""
+    IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF = 0x100, 0x200, 0x400, 0x800
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}   # wd -> directory
+        self.known = set()
+
+    def add_tree(self, root):
+        """Watches root and all its subdirectories; returns the newly watched directories."""
+        added = []
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            if path in self.known: continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == 28:  # ENOSPC: max_user_watches erreicht
+                    raise OSError(err, "inotify watch limit reached")
+                continue
+            self.dirs[wd] = path
+            self.known.add(path)
+            added.append(path)
+            stack.extend(list_media_dir(path)[1])
+        return added
+
+    def changes(self, timeout):
+        """Waits up to timeout seconds; returns (changed_dirs, overflow)."""
+        changed, overflow = set(), False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready: return changed, overflow
+        buf = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset + self.EVENT.size <= len(buf):
+            wd, mask, _cookie, length = self.EVENT.unpack_from(buf, offset)
+            name = buf[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0")
+            offset += self.EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None: continue
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                self.known.discard(directory)
+                continue
+            changed.add(directory)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                # Dateien, die vor dem Watch im neuen Ordner landeten, über den Ordner-Rescan erfassen
+                try:
+                    changed.update(self.add_tree(os.path.join(directory, os.fsdecode(name))))
+                except OSError:
+                    overflow = True
+        return changed, overflow
+
+    def close(self):
+        try: os.close(self.fd)
+        except OSError: pass
+
+class PollingBackend:
+    """Fallback watcher: polls directory mtimes only (they change when entries are added/removed/renamed)."""
+    def __init__(self):
+        self.mtimes = {}
+        self.known = self.mtimes
+        self._last_poll = time.monotonic()
+
+    def add_tree(self, root):
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            if path in self.mtimes: continue
+            try:
+                self.mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            stack.extend(list_media_dir(path)[1])
+
+    def changes(self, timeout):
+        wait = self._last_poll + WATCH_POLL_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            return set(), False
+        self._last_poll = time.monotonic()
+        changed = set()
+        for path, mtime in list(self.mtimes.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                del self.mtimes[path]
+                changed.add(os.path.dirname(path))
+                continue
+            if current != mtime:
+                self.mtimes[path] = current
+                changed.add(path)
+        return changed, False
+
+    def close(self): pass
+
+class FolderWatcher:
+    """Watches the library folder, debounces bursts and pushes only the changed tracks to the UI."""
+    def __init__(self, api):
+        self.api = api
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _make_backend(self, root):
+        if sys.platform.startswith("linux"):
+            try:
+                backend = InotifyBackend()
+                try:
+                    backend.add_tree(root)
+                    return backend
+                except OSError:
+                    backend.close()
+            except (OSError, AttributeError):
+                pass
+        backend = PollingBackend()
+        backend.add_tree(root)
+        return backend
+
+    def _run(self):
+        while True:
+            root = str(Path(self.api.current_path).absolute())
+            if not os.path.isdir(root):
+                time.sleep(WATCH_POLL_INTERVAL)
+                continue
+            backend = self._make_backend(root)
+            pending, first, last = set(), None, None
+            try:
+                while self.api.current_path and str(Path(self.api.current_path).absolute()) == root:
+                    dirs, overflow = backend.changes(timeout=0.5)
+                    now = time.monotonic()
+                    if overflow:
+                        # Events verloren: einmal komplett über den (inkrementellen) Index neu laden
+                        self._push('refreshPlaylist()')
+                        pending, first, last = set(), None, None
+                        continue
+                    if dirs:
+                        pending |= dirs
+                        first = first or now
+                        last = now
+                    if pending and (now - last >= WATCH_DEBOUNCE or now - first >= WATCH_MAX_DELAY):
+                        self._flush(backend, root, pending)
+                        pending, first, last = set(), None, None
+            except Exception:
+                time.sleep(WATCH_POLL_INTERVAL)
+            finally:
+                backend.close()
+
+    def _flush(self, backend, root, dirs):
+        """Re-lists the dirty directories, updates the index and pushes the delta."""
+        prefix = os.path.join(root, "")
+        found, scopes = {}, []
+        for d in dirs:
+            if d != root and not d.startswith(prefix): continue
+            files, subdirs = list_media_dir(d)
+            found.update(files)
+            scopes.append(d)
+            for sub in subdirs:
+                if sub not in backend.known:
+                    # Neuer Ordner (z.B. reinkopiertes Album): komplett einlesen und beobachten
+                    found.update(walk_media_files(sub))
+                    try: backend.add_tree(sub)
+                    except OSError: pass
+        if not scopes: return
+        known = library_index.stamps()
+        removed, subdir_exists = [], {}
+        for fp in known:
+            if fp in found: continue
+            parent = os.path.dirname(fp)
+            if parent in dirs:
+                removed.append(fp)
+                continue
+            for d in scopes:
+                if not fp.startswith(os.path.join(d, "")): continue
+                # Datei in einem Unterordner: nur entfernen, wenn dieser Unterordner gelöscht wurde
+                child = os.path.join(d, os.path.relpath(fp, d).split(os.sep)[0])
+                if child not in subdir_exists:
+                    subdir_exists[child] = os.path.isdir(child)
+                if not subdir_exists[child]:
+                    removed.append(fp)
+                break
+        stale = self.api._update_index(found, known, removed)
+        if not stale and not removed: return
+        entries = library_index.entries(set(stale))
+        delta = {
+            "added": [e for e in entries if e["path"] not in known],
+            "modified": [e for e in entries if e["path"] in known],
+            "removed": removed
+        }
+        self._push(f"applyLibraryDelta({json.dumps(delta)})")
+
+    def _push(self, js):
+        if window:
+            try:
+                window.evaluate_js(js)
+            except:
+                pass
+
+# --- DOWNLOAD MANAGER ---
+class DownloadCancelled(Exception):
+    pass
+
+def track_key(title, artist):
+    """Loose identity of a track: accents, case, brackets like '(Official Video)' and ' - Topic' ignored."""
+    title = re.sub(r'[\(\[][^\)\]]*[\)\]]', '', normalize_text(title))
+    artist = normalize_text(artist).replace(' - topic', '')
+    return " ".join(title.split()), " ".join(artist.split())
+
+class LibraryMatcher:
+    """Answers 'is this remote track already in the library?' by source id or title/artist/duration."""
+    DURATION_TOLERANCE = 3
+
+    def __init__(self, rows):
+        self.source_ids = set()
+        self.durations = {}
+        for name, artist, duration, source_id in rows:
+            if source_id: self.source_ids.add(source_id)
+            self.durations.setdefault(track_key(name, artist), []).append(duration or 0)
+
+    def contains(self, source_id, title, artist, duration):
+        if source_id and source_id in self.source_ids: return True
+        known = self.durations.get(track_key(title, artist))
+        if not known: return False
+        if not duration: return True
+        return any(not d or abs(d - duration) <= self.DURATION_TOLERANCE for d in known)
+
+    def add(self, source_id, title, artist, duration):
+        if source_id: self.source_ids.add(source_id)
+        self.durations.setdefault(track_key(title, artist), []).append(duration or 0)
+
+class DownloadManager:
+    """Runs yt-dlp downloads on a bounded worker pool with a persisted job list.
+
+    Every job has an id, a status (queued, downloading, processing, done, error,
+    cancelled) and a progress value; changes are pushed via updateDownloadJob().
+    Unfinished jobs in downloads.json are queued again on the next start.
+    """
+    ACTIVE = ("queued", "downloading", "processing")
+
+    def __init__(self, api, workers=2, jobs_file=DOWNLOAD_JOBS_FILE):
+        self.api = api
+        self.jobs_file = jobs_file
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._cancelled = set()
+        self._finished_batches = set()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.jobs_file, 'r', encoding='utf-8') as f:
+                jobs = json.load(f)
+        except (OSError, ValueError):
+            return
+        for job in jobs:
+            if job.get("status") in self.ACTIVE:
+                job.update(status="queued", progress=0)
+            self._jobs[job["id"]] = job
+        for job in list(self._jobs.values()):
+            if job["status"] == "queued":
+                self._pool.submit(self._run, job["id"])
+
+    def _save(self):
+        """Persists the job list; called on status changes, not on progress ticks."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        finished = [j for j in jobs if j["status"] not in self.ACTIVE]
+        for old in finished[:-DOWNLOAD_HISTORY]:
+            jobs.remove(old)
+            with self._lock:
+                self._jobs.pop(old["id"], None)
+        try:
+            write_json_atomic(self.jobs_file, jobs, indent=2)
+        except OSError:
+            pass
+
+    def _push(self, job):
+        if window:
+            try:
+                window.evaluate_js(f"updateDownloadJob({json.dumps(job)})")
+            except:
+                pass
+
+    def _update(self, job_id, persist=True, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job: return None
+            job.update(fields)
+            snapshot = dict(job)
+        if persist: self._save()
+        self._push(snapshot)
+        return snapshot
+
+    def enqueue(self, url, folder, title=None, use_spotify=False):
+        return self.enqueue_many([(url, title)], folder, use_spotify)[0]
+
+    def enqueue_many(self, items, folder, use_spotify=False, batch=None):
+        """Queues (url, title) pairs with a single save; jobs of a batch update the library once at the end."""
+        now = time.time()
+        jobs = [{
+            "id": hashlib.sha1(f"{url}|{now}|{i}".encode('utf-8')).hexdigest()[:12],
+            "url": url,
+            "folder": folder,
+            "title": title or url,
+            "use_spotify": bool(use_spotify),
+            "batch": batch,
+            "status": "queued",
+            "progress": 0,
+            "filename": None,
+            "path": None,
+            "message": None,
+            "created": now + i * 1e-6,
+        } for i, (url, title) in enumerate(items)]
+        with self._lock:
+            for job in jobs:
+                self._jobs[job["id"]] = job
+        self._save()
+        for job in jobs:
+            self._push(job)
+            self._pool.submit(self._run, job["id"])
+        return [dict(job) for job in jobs]
+
+    def jobs(self):
+        with self._lock:
+            return sorted((dict(j) for j in self._jobs.values()), key=lambda j: j["created"])
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Während ffmpeg konvertiert, lässt sich der Job nicht mehr sauber abbrechen
+            if not job or job["status"] not in ("queued", "downloading"): return False
+            self._cancelled.add(job_id)
+        if job["status"] == "queued":
+            self._update(job_id, status="cancelled")
+        return True
+
+    def clear_finished(self):
+        with self._lock:
+            for job_id in [i for i, j in self._jobs.items() if j["status"] not in self.ACTIVE]:
+                del self._jobs[job_id]
+        self._save()
+        return True
+
+    def _check_cancelled(self, job_id):
+        if job_id in self._cancelled:
+            raise DownloadCancelled()
+
+    def _run(self, job_id):
+        job = self.get(job_id)
+        if not job or job["status"] != "queued" or job_id in self._cancelled:
+            self._cancelled.discard(job_id)
+            if job and job.get("batch"): self._finish_batch(job["batch"])
+            return
+        temp_path = None
+        try:
+            self._update(job_id, status="downloading", progress=0)
+            import yt_dlp
+            with yt_dlp.YoutubeDL({'quiet': True, 'ffmpeg_location': FFMPEG_PATH}) as ydl:
+                info = ydl.extract_info(job["url"], download=False)
+            self._check_cancelled(job_id)
+            title = info.get('title', 'Unknown')
+            artist = info.get('artist') or info.get('channel') or info.get('uploader', 'Unknown Artist')
+            album = info.get('album', '')
+            clean_name = "".join([c for c in title if c.isalnum() or c in (' ', '.', '_')]).strip()
+            temp_path = os.path.join(job["folder"], clean_name)
+            final_path = temp_path + ".mp3"
+            self._update(job_id, title=title, filename=clean_name)
+
+            last = [0.0, -1]
+            def hook(d):
+                self._check_cancelled(job_id)
+                if d['status'] != 'downloading': return
+                total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                progress = int(d.get('downloaded_bytes', 0) * 100 / total) if total else 0
+                now = time.monotonic()
+                if progress != last[1] and now - last[0] >= 0.25:
+                    last[:] = [now, progress]
+                    self._update(job_id, persist=False, progress=progress)
+
+            ydl_opts = {
+                'format': 'bestaudio/best',
+                'outtmpl': temp_path,
+                'progress_hooks': [hook],
+                'postprocessors': [
+                    {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'},
+                    {'key': 'FFmpegMetadata', 'add_metadata': True},
+                ],
+                'writethumbnail': True,
+                'quiet': True,
+                'ffmpeg_location': FFMPEG_PATH,
+            }
+            # Das bereits aufgelöste info-Dict weiterverwenden statt die URL erneut zu extrahieren
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.process_ie_result(info, download=True)
+            self._update(job_id, status="processing", progress=100)
+
+            thumb_path = None
+            for ext in ['.webp', '.jpg', '.png', '.jpeg']:
+                tp = temp_path + ext
+                if os.path.exists(tp):
+                    thumb_path = tp
+                    break
+
+            self.api._apply_tags(final_path, title, artist, album, thumb_path, source_id=info.get('id'))
+
+            if thumb_path:
+                try: os.remove(thumb_path)
+                except: pass
+
+            if not job.get("batch"):
+                self.api.add_to_library([final_path])
+            self._update(job_id, status="done", progress=100, path=final_path)
+        except Exception as e:
+            if job_id in self._cancelled or isinstance(e, DownloadCancelled):
+                if temp_path: self._remove_partials(temp_path)
+                self._update(job_id, status="cancelled")
+            else:
+                self._update(job_id, status="error", message=str(e))
+        finally:
+            self._cancelled.discard(job_id)
+            if job.get("batch"): self._finish_batch(job["batch"])
+
+    def _finish_batch(self, batch):
+        """Adds all downloaded files of a batch to the library once its last job has ended."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if j.get("batch") == batch]
+            if any(j["status"] in self.ACTIVE for j in jobs) or batch in self._finished_batches: return
+            self._finished_batches.add(batch)
+        paths = [j["path"] for j in jobs if j["status"] == "done" and j.get("path")]
+        if paths: self.api.add_to_library(paths)
+
+    @staticmethod
+    def _remove_partials(temp_path):
+        folder, base = os.path.split(temp_path)
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return
+        leftovers = ('.part', '.ytdl', '.webp', '.jpg', '.png', '.jpeg')
+        for name in names:
+            # outtmpl hat keine Endung: Rohdatei heißt wie base, Teilstücke base.part / base.part-FragN
+            if name == base or name.startswith(base + ".") and \
+                    (name[len(base):] in leftovers or name[len(base):].startswith('.part')):
+                try: os.remove(os.path.join(folder, name))
+                except OSError: pass
+
+# --- RADIO METADATA MONITOR ---
+class RadioMonitor:
+    """Holds one long-lived ICY connection for the playing station and pushes title changes.
+
+    The stream is read block by block (icy-metaint bytes of audio, then a metadata block),
+    so a title change is seen as soon as the station sends it. Only changed titles are
+    pushed to the frontend and to Discord. Broken connections are retried with backoff.
+    """
+    BACKOFF_MIN = 1
+    BACKOFF_MAX = 60
+    TIMEOUT = (5, 30)
+
+    def __init__(self, api):
+        self.api = api
+        self._session = None
+        self._lock = threading.Lock()
+        self._station = None
+        self._generation = 0
+        self._response = None
+
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update({'Icy-MetaData': '1'})
+        return self._session
+
+    def watch(self, url, name=None):
+        """Starts monitoring url, replacing the previously monitored station."""
+        station = {"url": url, "name": name or "Web Radio", "image": "app_logo"}
+        known = station_registry.find(url=url)
+        if known:
+            station["name"] = known.get("name", station["name"])
+            station["image"] = image_store.to_url(known.get("image")) or "app_logo"
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._station = station
+            self._close()
+        threading.Thread(target=self._run, args=(generation, station), daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            self._generation += 1
+            self._station = None
+            self._close()
+
+    def _close(self):
+        if self._response is not None:
+            try: self._response.close()
+            except: pass
+            self._response = None
+
+    def _current(self, generation):
+        return generation == self._generation
+
+    def _run(self, generation, station):
+        backoff = self.BACKOFF_MIN
+        last_title = None
+        while self._current(generation):
+            try:
+                response = self.session().get(station["url"], stream=True, timeout=self.TIMEOUT)
+                with self._lock:
+                    if not self._current(generation):
+                        response.close()
+                        return
+                    self._response = response
+                response.raise_for_status()
+                metaint = int(response.headers.get('icy-metaint', 0))
+                if station["name"] == "Web Radio":
+                    station["name"] = response.headers.get('icy-name', station["name"])
+                if metaint <= 0:
+                    # Sender ohne ICY-Metadaten: einmal melden, Verbindung nicht offen halten
+                    self._publish(generation, station, "Live Stream")
+                    response.close()
+                    return
+                stream = response.raw
+                while self._current(generation):
+                    if len(stream.read(metaint)) < metaint:
+                        raise EOFError
+                    length_byte = stream.read(1)
+                    if not length_byte:
+                        raise EOFError
+                    backoff = self.BACKOFF_MIN
+                    metadata_len = length_byte[0] * 16
+                    if metadata_len == 0:
+                        continue
+                    raw_metadata = stream.read(metadata_len).decode('utf-8', errors='ignore')
+                    match = re.search(r"StreamTitle='([^']*)';", raw_metadata)
+                    title = match.group(1) if match else None
+                    if title and title != last_title:
+                        last_title = title
+                        self._publish(generation, station, title)
+            except Exception:
+                if not self._current(generation): return
+                if last_title is None:
+                    self._publish(generation, station, "Live Radio")
+                    last_title = "Live Radio"
+            finally:
+                with self._lock:
+                    if self._current(generation): self._close()
+            with self._lock:
+                if not self._current(generation): return
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.BACKOFF_MAX)
+
+    def _publish(self, generation, station, title):
+        if not self._current(generation): return
+        data = {"url": station["url"], "title": title, "station": station["name"],
+                "cover": station["image"], "sp_cover": station["image"]}
+        if window:
+            try:
+                window.evaluate_js(f"onRadioMetadata({json.dumps(data)})")
+            except:
+                pass
+        self.api.update_radio_discord(title, station["name"])
+
 # --- API FOR FRONTEND ---
 class Api:
     def __init__(self):
@@ -207,6 +2220,18 @@ class Api:
         
         discord_id = DISCORD_CLIENT_ID or self._config.get("discord_client_id", "YOUR_DISCORD_ID")
         self._discord = DiscordManager(discord_id)
+        metrics.registry.counter_func(
+            "inferno_discord_presence_total", "Discord Rich Presence updates by outcome",
+            lambda: dict(self._discord.stats), ("event",))
+        self._scan_token = None
+        self._presence_lock = threading.Lock()
+        self._presence_generation = 0
+        self._presence_worker = ThreadPoolExecutor(max_workers=1)
+        self._extractor = MetadataExtractor(
+            self._config.get("scan_engine", "process"), self._config.get("scan_workers", 0)
+        )
+        self._radio_monitor = RadioMonitor(self)
+        self._downloads = DownloadManager(self, self._config.get("download_workers", 2), DOWNLOAD_JOBS_FILE)
 
     def load_config(self):
         if not CONFIG_FILE.exists():
@@ -214,7 +2239,10 @@ class Api:
                 "default_path": str(Path.home() / "Music"),
                 "discord_client_id": "1471223610315247616",
                 "devtools": True,
-                "ambient_glow": False
+                "ambient_glow": False,
+                "scan_engine": "process",
+                "scan_workers": 0,
+                "download_workers": 2
             }
             self.save_config_dict(default)
             return default
@@ -252,13 +2280,6 @@ class Api:
         self.save_config_dict(self._config)
         return enabled
 
-    def _progress_hook(self, d):
-        if d['status'] == 'downloading':
-            p = d.get('_percent_str', '0%').replace('%', '').strip()
-            try:
-                if window: window.evaluate_js(f"updateDownloadProgress({p})")
-            except: pass
-
     def search_song(self, query):
         ydl_opts = {
             'quiet': True,
@@ -266,6 +2287,7 @@ class Api:
             'extract_flat': True,
         }
         try:
+            import yt_dlp
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(f"ytmusicsearch5:{query}", download=False)
                 entries = []
@@ -286,53 +2308,77 @@ class Api:
                 return entries
         except Exception as e: return {"error": str(e)}
 
-    def download_track(self, yt_url, use_spotify=False):
+    def enqueue_download(self, yt_url, use_spotify=False, title=None):
+        """Queues a download into the current folder and returns the job (see get_download_jobs)."""
+        folder = os.path.abspath(self.current_path)
+        return self._downloads.enqueue(yt_url, folder, title, use_spotify)
+
+    def import_playlist(self, url, use_spotify=False):
+        """Queues every track of a playlist/album URL that is not in the library yet.
+
+        All entries come from one flat extraction; the library is updated once when the
+        whole batch has finished.
+        """
+        ydl_opts = {'quiet': True, 'ffmpeg_location': FFMPEG_PATH, 'extract_flat': 'in_playlist'}
         try:
-            with yt_dlp.YoutubeDL({'quiet': True, 'ffmpeg_location': FFMPEG_PATH}) as ydl:
-                info = ydl.extract_info(yt_url, download=False)
-                title = info.get('title', 'Unknown')
-                artist = info.get('artist') or info.get('channel') or info.get('uploader', 'Unknown Artist')
-                album = info.get('album', '')
-            clean_name = "".join([c for c in title if c.isalnum() or c in (' ', '.', '_')]).strip()
-            temp_path = os.path.join(self.current_path, clean_name)
-            final_path = temp_path + ".mp3"
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'outtmpl': temp_path,
-                'progress_hooks': [self._progress_hook],
-                'postprocessors': [
-                    {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'},
-                    {'key': 'FFmpegMetadata', 'add_metadata': True},
-                ],
-                'writethumbnail': True,
-                'quiet': True,
-                'ffmpeg_location': FFMPEG_PATH,
-            }
+            import yt_dlp
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([yt_url])
+                info = ydl.extract_info(url, download=False)
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+        entries = info.get('entries') if info.get('entries') is not None else [info]
+        matcher = LibraryMatcher(library_index.identities())
+        queue_items, skipped = [], []
+        for e in entries:
+            if not e: continue
+            video_id = e.get('id', '')
+            entry_url = e.get('url') or e.get('webpage_url', '')
+            if not entry_url.startswith(('http://', 'https://')):
+                entry_url = f"https://music.youtube.com/watch?v={video_id}" if video_id else ''
+            if not entry_url: continue
+            title = e.get('title', 'Unknown')
+            artist = e.get('artist') or e.get('channel') or e.get('uploader', '')
+            duration = e.get('duration') or 0
+            if matcher.contains(video_id, title, artist, duration):
+                skipped.append(title)
+                continue
+            # Auch Dubletten innerhalb der Playlist nur einmal laden
+            matcher.add(video_id, title, artist, duration)
+            queue_items.append((entry_url, title))
+        batch = hashlib.sha1(f"{url}|{time.time()}".encode('utf-8')).hexdigest()[:12]
+        folder = os.path.abspath(self.current_path)
+        jobs = self._downloads.enqueue_many(queue_items, folder, use_spotify, batch) if queue_items else []
+        return {"status": "success", "batch": batch, "title": info.get('title', ''),
+                "total": len(entries), "queued": len(jobs), "skipped": skipped}
 
-            thumb_path = None
-            for ext in ['.webp', '.jpg', '.png', '.jpeg']:
-                tp = temp_path + ext
-                if os.path.exists(tp):
-                    thumb_path = tp
-                    break
+    def get_download_jobs(self):
+        return self._downloads.jobs()
 
-            self._apply_tags(final_path, title, artist, album, thumb_path)
+    def cancel_download(self, job_id):
+        return self._downloads.cancel(job_id)
 
-            if thumb_path:
-                try: os.remove(thumb_path)
-                except: pass
+    def clear_finished_downloads(self):
+        return self._downloads.clear_finished()
 
-            return {"status": "success", "filename": clean_name}
-        except Exception as e: return {"status": "error", "message": str(e)}
+    def download_track(self, yt_url, use_spotify=False):
+        """Blocking variant kept for plugins: queues the job and waits for it to finish."""
+        job = self.enqueue_download(yt_url, use_spotify)
+        while job and job["status"] in DownloadManager.ACTIVE:
+            time.sleep(0.5)
+            job = self._downloads.get(job["id"])
+        if job and job["status"] == "done":
+            return {"status": "success", "filename": job["filename"], "job": job["id"]}
+        return {"status": "error", "message": (job or {}).get("message") or "cancelled"}
 
-    def _apply_tags(self, file_path, yt_title, artist="Unknown Artist", album="", thumb_path=None):
+    def _apply_tags(self, file_path, yt_title, artist="Unknown Artist", album="", thumb_path=None, source_id=None):
         try:
             audio = MP3(file_path, ID3=ID3)
             audio.tags.add(TIT2(encoding=3, text=yt_title))
             audio.tags.add(TPE1(encoding=3, text=artist))
             audio.tags.add(TALB(encoding=3, text=album or "Inferno Downloads"))
+            if source_id:
+                # Video-ID der Quelle, damit Playlist-Importe bereits geladene Titel erkennen
+                audio.tags.add(TXXX(encoding=3, desc='source_id', text=source_id))
             if thumb_path:
                 with open(thumb_path, 'rb') as f:
                     thumb_data = f.read()
@@ -345,6 +2391,8 @@ class Api:
         return f"http://127.0.0.1:{self.port}/media?path={urllib.parse.quote(str(file_path))}"
 
     def select_folder(self):
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk(); root.withdraw()
         path = filedialog.askdirectory()
         root.destroy()
@@ -355,40 +2403,180 @@ class Api:
         return None
 
     def scan_folder(self, folder_path_str=None):
+        """Returns the library, only re-reading files that are new or changed since the last scan."""
         search_path = Path(folder_path_str if folder_path_str else self.current_path)
-        files_list = []
-        exts = ('.mp3', '.ogg', '.wav', '.mp4', '.webm')
+        started = time.perf_counter()
         try:
             if not search_path.exists(): return []
-            all_files = []
-            for file in search_path.rglob('*'):
-                if file.suffix.lower() in exts:
-                    all_files.append(str(file.absolute()))
-            with ThreadPoolExecutor(max_workers=8) as executor:
-                fut_map = {executor.submit(self._scan_single, fp): fp for fp in all_files}
-                for fut in as_completed(fut_map):
-                    try:
-                        result = fut.result()
-                        if result:
-                            files_list.append(result)
-                    except:
-                        pass
-        except: pass
+            root = str(search_path.absolute())
+            found = walk_media_files(root)
+            known = library_index.stamps()
+            prefix = os.path.join(root, "")
+            removed = [fp for fp in known if fp.startswith(prefix) and fp not in found]
+            stale = self._update_index(found, known, removed)
+            files_list = library_index.entries(found)
+            record_scan("full", time.perf_counter() - started, len(found), len(stale))
+        except:
+            return []
         return sorted(files_list, key=lambda x: x['name'])
 
-    def _scan_single(self, file_path):
+    def _update_index(self, found, known, removed):
+        """Runs mutagen on new/changed files of found, drops removed; returns the re-read paths."""
+        stale = [fp for fp, stamp in found.items() if known.get(fp) != stamp]
+        library_index.remove(removed)
+        if stale:
+            fresh = []
+            for records in self._extractor.extract(stale):
+                fresh.extend((rec, found[rec[0]]) for rec in records)
+            library_index.upsert(fresh)
+        return stale
+
+    def add_to_library(self, paths):
+        """Indexes single new files (e.g. finished downloads) and pushes them as a playlist delta."""
+        found, known = {}, {}
+        for fp in paths:
+            try:
+                st = os.stat(fp)
+            except OSError:
+                continue
+            found[fp] = (st.st_size, st.st_mtime_ns)
+            if library_index.id_for_path(fp) is not None:
+                known[fp] = None
+        stale = self._update_index(found, known, [])
+        prefix = os.path.join(str(Path(self.current_path).absolute()), "")
+        entries = [e for e in library_index.entries(set(stale)) if e["path"].startswith(prefix)]
+        if not entries or not window: return
+        delta = {
+            "added": [e for e in entries if e["path"] not in known],
+            "modified": [e for e in entries if e["path"] in known],
+            "removed": []
+        }
         try:
-            meta = self.get_metadata(file_path, update_discord=False)
-            return {
-                "name": meta["title"],
-                "artist": meta["artist"],
-                "path": file_path,
-                "cover": meta["cover"],
-                "duration": meta["duration"],
-                "filename": str(Path(file_path).name)
-            }
+            window.evaluate_js(f"applyLibraryDelta({json.dumps(delta)})")
         except:
-            return None
+            pass
+
+    def get_library_snapshot(self):
+        """Last persisted playlist of the current folder, so the list is filled instantly at launch."""
+        startup_timer.mark("bridge_ready")
+        root = str(Path(self.current_path).absolute())
+        items = library_snapshot.get(root)
+        startup_timer.mark("snapshot")
+        return {"root": root, "cached": items is not None, "items": items or []}
+
+    def start_library_scan(self, token=0, folder_path_str=None, revalidate=False):
+        """Starts a progressive scan; results arrive via appendLibraryBatch()/finishLibraryScan().
+
+        With revalidate=True the frontend already shows the snapshot and only gets the differences.
+        """
+        root = str(Path(folder_path_str if folder_path_str else self.current_path).absolute())
+        shown = None
+        if revalidate:
+            shown = {e["path"]: e for e in library_snapshot.get(root) or []}
+        self._scan_token = token
+        threading.Thread(target=self._progressive_scan, args=(token, root, shown), daemon=True).start()
+        return {"status": "started", "token": token}
+
+    def report_startup(self, stage):
+        """Called by the frontend at startup milestones; returns all timings and the budget verdict."""
+        startup_timer.mark(stage)
+        return startup_timer.report()
+
+    def search_library(self, query, limit=200):
+        """Ranked full-text search over title, artist, album and filename of the current folder."""
+        prefix = os.path.join(str(Path(self.current_path).absolute()), "")
+        return search_index.search(query, max(1, min(int(limit), 5000)), prefix)
+
+    def _push_batch(self, token, items):
+        for i in range(0, len(items), SCAN_BATCH_SIZE):
+            if window:
+                try:
+                    window.evaluate_js(f"appendLibraryBatch({json.dumps(token)}, {json.dumps(items[i:i + SCAN_BATCH_SIZE])})")
+                except:
+                    pass
+
+    def _progressive_scan(self, token, root, shown=None):
+        """Emits cached entries at once, then new/changed files in batches while the walk is running.
+
+        `shown` maps path -> entry of what the frontend already lists (the launch snapshot);
+        then only entries that differ from it are sent.
+        """
+        prefix = os.path.join(root, "")
+        removed = []
+        started = time.perf_counter()
+        try:
+            if not os.path.isdir(root): return
+            known = library_index.stamps()
+            cached = library_index.entries_under(prefix)
+            if shown is None:
+                self._push_batch(token, cached)
+            else:
+                self._push_batch(token, [e for e in cached if shown.get(e["path"]) != e])
+
+            found, fresh, chunk, pending = {}, [], [], []
+            results = queue.Queue()
+            last_flush = time.monotonic()
+            chunk_size = self._extractor.chunk_size()
+
+            def flush():
+                library_index.upsert(fresh)
+                self._push_batch(token, library_index.entries({rec[0] for rec, _ in fresh}))
+                fresh.clear()
+
+            def submit():
+                fut = self._extractor.submit(list(chunk))
+                pending.append(fut)
+                fut.add_done_callback(lambda f, paths=list(chunk): results.put((paths, f)))
+                chunk.clear()
+
+            def collect(timeout):
+                nonlocal last_flush
+                try:
+                    while True:
+                        paths, fut = results.get(timeout=timeout)
+                        pending.remove(fut)
+                        timeout = 0
+                        fresh.extend((rec, found[rec[0]]) for rec in self._extractor.result(fut, paths))
+                except queue.Empty:
+                    pass
+                if fresh and (len(fresh) >= SCAN_BATCH_SIZE or time.monotonic() - last_flush >= SCAN_BATCH_INTERVAL):
+                    flush()
+                    last_flush = time.monotonic()
+
+            extracted = 0
+            for fp, stamp in iter_media_files(root):
+                if self._scan_token != token:
+                    for fut in pending: fut.cancel()
+                    return
+                found[fp] = stamp
+                if known.get(fp) != stamp:
+                    extracted += 1
+                    chunk.append(fp)
+                    if len(chunk) >= chunk_size: submit()
+                    collect(0)
+            if chunk: submit()
+            while pending and self._scan_token == token:
+                collect(SCAN_BATCH_INTERVAL)
+            if fresh: flush()
+
+            listed = {e["path"] for e in cached}.union(shown or ())
+            removed = [p for p in listed if p not in found]
+            library_index.remove(removed)
+            # Suchindex im Hintergrund aufbauen, damit die erste Eingabe nicht wartet
+            threading.Thread(target=search_index.ensure_loaded, daemon=True).start()
+            if self._scan_token == token:
+                record_scan("progressive", time.perf_counter() - started, len(found), extracted)
+                threading.Thread(
+                    target=lambda: library_snapshot.save(root, library_index.entries_under(prefix)), daemon=True
+                ).start()
+        except:
+            pass
+        finally:
+            if window and self._scan_token == token:
+                try:
+                    window.evaluate_js(f"finishLibraryScan({json.dumps(token)}, {json.dumps(removed)})")
+                except:
+                    pass
 
     def get_metadata(self, file_path, update_discord=True):
         path_str = file_path
@@ -402,49 +2590,55 @@ class Api:
             "type": "audio",
             "sp_cover": ""
         }
-        raw_cover_data = None
-        cover_mime = None
-        try:
-            if path_str.lower().endswith(('.mp4', '.webm')):
-                metadata["type"] = "video"
-                m = MutagenFile(path_str)
-                if m: metadata["duration"] = m.info.length
-            elif path_str.lower().endswith('.mp3'):
-                audio = MP3(path_str, ID3=ID3)
-                metadata["duration"] = audio.info.length
-                if audio.tags:
-                    if 'TIT2' in audio.tags: metadata["title"] = str(audio.tags['TIT2'].text[0])
-                    if 'TPE1' in audio.tags: metadata["artist"] = str(audio.tags['TPE1'].text[0])
-                    if 'TALB' in audio.tags: metadata["album"] = str(audio.tags['TALB'].text[0])
-                    for tag in audio.tags.values():
-                        if isinstance(tag, APIC):
-                            b64 = base64.b64encode(tag.data).decode('utf-8')
-                            metadata["cover"] = f"data:{tag.mime};base64,{b64}"
-                            
-                            # Wir sichern die Bytes, um sie erst beim Abspielen hochzuladen
-                            raw_cover_data = tag.data
-                            cover_mime = tag.mime
-                            break
-            
-            # Wichtig: Die zeitaufwendige Websuche und der Upload passieren erst BEIM ABSPIELEN
+        try:
+            info = read_tags(path_str)
+            for key in ("title", "artist", "album", "duration", "type"):
+                metadata[key] = info[key]
+            raw_cover_data = info["cover_data"]
+            cover_mime = info["cover_mime"]
+            if raw_cover_data:
+                track_id = library_index.id_for_path(path_str)
+                row = library_index.lookup(track_id) if track_id else None
+                if row:
+                    metadata["cover"] = cover_url(track_id, cover_key(*row), COVER_PLAYER_SIZE)
+                else:
+                    b64 = base64.b64encode(raw_cover_data).decode('utf-8')
+                    metadata["cover"] = f"data:{cover_mime};base64,{b64}"
+
+            # Die zeitaufwendige Websuche und der Upload laufen im Hintergrund, der Player startet sofort
             if update_discord:
-                # 1. Lokales Cover hochladen (falls vorhanden)
-                if raw_cover_data and cover_mime:
-                    uploaded_url = upload_cover_to_tmpfiles(cover_mime, raw_cover_data)
-                    if uploaded_url:
-                        metadata["sp_cover"] = uploaded_url
-                
-                # 2. Falls kein lokales Cover vorhanden war/Upload fehlschlug -> iTunes nutzen
-                sp_cover = metadata["sp_cover"]
-                if not sp_cover:
-                    sp_cover = get_itunes_cover_url(metadata["title"], metadata["artist"])
-                    metadata["sp_cover"] = sp_cover if sp_cover else ""
-                    
-                self._discord.update(metadata["title"], metadata["artist"], sp_cover)
+                self._queue_presence(metadata["title"], metadata["artist"], cover_mime, raw_cover_data)
 
         except: pass
         return metadata
 
+    def _queue_presence(self, title, artist, cover_mime=None, cover_data=None):
+        """Hands cover resolution + Discord update to the background worker; older tracks are dropped."""
+        with self._presence_lock:
+            self._presence_generation += 1
+            generation = self._presence_generation
+        self._presence_worker.submit(self._resolve_presence, generation, title, artist, cover_mime, cover_data)
+        return generation
+
+    def _is_current_presence(self, generation):
+        return generation == self._presence_generation
+
+    def _resolve_presence(self, generation, title, artist, cover_mime, cover_data):
+        """Runs on the presence worker: upload local cover, else iTunes lookup, then update Discord."""
+        try:
+            if not self._is_current_presence(generation): return
+            sp_cover = None
+            # 1. Lokales Cover hochladen (falls vorhanden)
+            if cover_data and cover_mime:
+                sp_cover = upload_cover_to_tmpfiles(cover_mime, cover_data)
+                if not self._is_current_presence(generation): return
+            # 2. Falls kein lokales Cover vorhanden war/Upload fehlschlug -> iTunes nutzen
+            if not sp_cover:
+                sp_cover = get_itunes_cover_url(title, artist)
+                if not self._is_current_presence(generation): return
+            self._discord.update(title, artist, sp_cover)
+        except: pass
+
     def show_in_folder(self, path):
         if platform.system() == "Windows": subprocess.run(['explorer', '/select,', os.path.normpath(path)])
         elif platform.system() == "Darwin": subprocess.run(['open', '-R', path])
@@ -454,20 +2648,17 @@ class Api:
     def get_radio_metadata(self, url):
         """Extracts ICY metadata from a live stream."""
         try:
+            import requests
             headers = {'Icy-MetaData': '1'}
             response = requests.get(url, headers=headers, stream=True, timeout=3)
             metaint = int(response.headers.get('icy-metaint', 0))
             station_name = response.headers.get('icy-name', 'Web Radio')
             
             # Liest das konfigurierte Sender-Logo aus stations_config.json aus
-            stations = self.get_default_radios()
-            station_image = "app_logo"
-            for s in stations:
-                if s.get("url") == url:
-                    station_image = s.get("image", "app_logo")
-                    station_name = s.get("name", station_name)
-                    break
-            
+            station = station_registry.find(url=url)
+            if station:
+                station_name = station.get("name", station_name)
+
             title = "Live Stream"
             if metaint > 0:
                 stream = response.raw
@@ -479,17 +2670,21 @@ class Api:
                     if match:
                         title = match.group(1)
                         
-            return {"title": title, "station": station_name, "cover": station_image, "sp_cover": station_image}
         except:
-            stations = self.get_default_radios()
-            station_image = "app_logo"
-            station_name = "Inferno Stream"
-            for s in stations:
-                if s.get("url") == url:
-                    station_image = s.get("image", "app_logo")
-                    station_name = s.get("name", "Web Radio")
-                    break
-            return {"title": "Live Radio", "station": station_name, "cover": station_image, "sp_cover": station_image}
+            title = "Live Radio"
+            station = station_registry.find(url=url)
+            station_name = station.get("name", "Web Radio") if station else "Inferno Stream"
+        cover = image_store.to_url((station or {}).get("image")) or "app_logo"
+        return {"title": title, "station": station_name, "cover": cover, "sp_cover": StationRegistry.presence_image(station)}
+
+    def start_radio_monitor(self, url, station_name=None):
+        """Monitors the station's ICY metadata; title changes are pushed via onRadioMetadata()."""
+        self._radio_monitor.watch(url, station_name)
+        return True
+
+    def stop_radio_monitor(self):
+        self._radio_monitor.stop()
+        return True
 
     def get_default_radios(self):
         """Returns a list of default radio stations loaded from json."""
@@ -497,40 +2692,17 @@ class Api:
     
     def update_radio_discord(self, title, station):
         """Updates Discord Rich Presence specifically for Radio streams."""
-        stations = self.get_default_radios()
-        station_image = "app_logo"
-        for s in stations:
-            if s.get("name") == station or s.get("url") == station:
-                station_image = s.get("image", "app_logo")
-                break
+        station_image = StationRegistry.presence_image(station_registry.find(url=station, name=station))
         if self._discord:
+            # Laufende Cover-Auflösung eines vorherigen Tracks darf den Radio-Status nicht überschreiben
+            with self._presence_lock:
+                self._presence_generation += 1
             self._discord.update(title, f"Listening to {station}", station_image)
 
     def start_folder_watch(self):
-        """Start a background thread that polls the media folder for changes."""
-        def _watcher():
-            last_scan = set()
-            while True:
-                time.sleep(5)
-                try:
-                    exts = ('.mp3', '.ogg', '.wav', '.mp4', '.webm')
-                    current = set()
-                    for f in Path(self.current_path).rglob('*'):
-                        if f.suffix.lower() in exts:
-                            current.add(str(f.absolute()))
-                    if current != last_scan:
-                        if last_scan:  # Skip first scan (already loaded)
-                            if window:
-                                try:
-                                    window.evaluate_js('refreshPlaylist()')
-                                except:
-                                    pass
-                        last_scan = current
-                except:
-                    pass
-
-        t = threading.Thread(target=_watcher, daemon=True)
-        t.start()
+        """Start the event-driven folder watcher (inotify, directory-mtime polling as fallback)."""
+        self._folder_watcher = FolderWatcher(self)
+        self._folder_watcher.start()
 
     def start_plugin_watch(self):
         """Watch the plugins directory for changes and auto-reload."""
@@ -574,56 +2746,79 @@ class Api:
             except: pass
         return plugins
 
+# --- WAVEFORM API ---
+
+    def request_waveforms(self, current, upcoming=None):
+        """Queues waveform peaks for the playing track first, then for the upcoming ones."""
+        if not waveform_service.available(): return False
+        waveform_service.focus(current, upcoming or [])
+        return True
+
 # --- FAVOURITES API ---
 
     def load_favourites(self):
-        """Loads all custom playlists from the JSON file."""
-        if not FAV_FILE.exists():
-            return []
+        """Loads all custom playlists (snapshot plus journal)."""
         try:
-            with open(FAV_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
+            return favourites_store.all()
+        except Exception:
             return []
 
     def save_favourites_list(self, fav_list):
-        """Saves the entire list of favourites to the JSON file."""
-        with open(FAV_FILE, 'w', encoding='utf-8') as f:
-            json.dump(fav_list, f, indent=4)
+        """Replaces the entire list of favourites (prefer the per-operation methods below)."""
+        favourites_store.replace(fav_list)
         return True
 
+    def create_favourite(self, name, image=None):
+        """Creates a playlist and returns it (with its generated id)."""
+        return favourites_store.create(name, image)
+
+    def rename_favourite(self, fav_id, name):
+        return favourites_store.update("rename", id=fav_id, name=name)
+
+    def set_favourite_image(self, fav_id, image):
+        return favourites_store.update("image", id=fav_id, image=image)
+
+    def delete_favourite(self, fav_id):
+        return favourites_store.update("delete", id=fav_id)
+
+    def add_track_to_favourite(self, fav_id, path):
+        return favourites_store.update("add", id=fav_id, path=path)
+
+    def remove_track_from_favourite(self, fav_id, path):
+        return favourites_store.update("remove", id=fav_id, path=path)
+
+    def move_favourite_track(self, fav_id, path, index):
+        """Moves a track to a new position inside the playlist."""
+        return favourites_store.update("move", id=fav_id, path=path, index=index)
+
     def select_fav_image(self):
-        """Opens a file dialog to pick a cover image for a playlist."""
-        root = tk.Tk(); root.withdraw()
-        path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.jpeg *.png *.webp")])
-        root.destroy()
-        if path:
-            with open(path, "rb") as img_file:
-                return f"data:image/png;base64,{base64.b64encode(img_file.read()).decode('utf-8')}"
-        return None
+        """Opens a file dialog to pick a cover image for a playlist; returns its media server URL."""
+        return self.select_image_file()
 
     def save_stations(self, stations):
         """Saves the radio stations list to stations_config.json."""
         try:
-            with open(STATIONS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(stations, f, indent=4)
+            station_registry.save(stations)
             return True
         except:
             return False
 
     def select_image_file(self):
-        """Opens a file dialog and returns the selected image as base64 data URL."""
+        """Opens a file dialog, stores the selected image and returns its media server URL."""
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk(); root.withdraw()
         path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.jpeg *.png *.webp")])
         root.destroy()
         if path:
-            with open(path, "rb") as img_file:
-                return f"data:image/png;base64,{base64.b64encode(img_file.read()).decode('utf-8')}"
+            return image_store.to_url(image_store.put_file(path))
         return None
     
     
 def run():
     global window
+    startup_timer.mark("imports")
+    library_snapshot.preload()
     threading.Thread(target=start_server, daemon=True).start()
     api = Api()
     api.start_folder_watch()
@@ -637,6 +2832,7 @@ def run():
         min_size=(1150, 687),
         background_color='#050000'
     )
+    startup_timer.mark("window")
     webview.start(debug=api._config.get("devtools", True))
 
 if __name__ == '__main__':
@@ -0,0 +1,136 @@
+"""Minimale Prometheus-Metriken (Textformat 0.0.4) für den Player (main.py) und den Bot (discord_vc_bot.py).
+
+Bewusst ohne prometheus_client: Zähler und Histogramme sind ein paar Dict-Operationen unter
+einem Lock, und alles, was ohnehin schon gezählt wird (z. B. die `stats`-Dicts von
+WSAudioSource und DiscordManager), wird erst beim Scrapen über Collector-Funktionen gelesen.
+Auf den heißen Pfaden kostet das damit praktisch nichts.
+"""
+import bisect
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra: parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value):
+    if value == float("inf"): return "+Inf"
+    if isinstance(value, float) and value.is_integer(): return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}   # labels -> [counts pro Bucket..., +Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(row)) for key, row in self._values.items()]
+        out = []
+        for key, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row):
+                cumulative += count
+                out.append((self.name + "_bucket", _labels(self.labelnames, key, f'le="{_number(bound)}"'), cumulative))
+            out.append((self.name + "_sum", _labels(self.labelnames, key), row[-1]))
+            out.append((self.name + "_count", _labels(self.labelnames, key), cumulative))
+        return out
+
+
+class Collector:
+    """Value(s) computed at scrape time; fn returns a number, None, or {label tuple: number}."""
+
+    def __init__(self, name, help, kind, fn, labels=()):
+        self.name, self.help, self.kind, self.fn, self.labelnames = name, help, kind, fn, tuple(labels)
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None: return []
+        if not isinstance(value, dict):
+            return [(self.name, "", value)]
+        return [(self.name, _labels(self.labelnames, key if isinstance(key, tuple) else (key,)), v)
+                for key, v in value.items() if v is not None]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        # gleicher Name -> ersetzen (z. B. wenn ein Objekt neu erzeugt wurde)
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge_func(self, name, help, fn, labels=()):
+        return self._add(Collector(name, help, "gauge", fn, labels))
+
+    def counter_func(self, name, help, fn, labels=()):
+        return self._add(Collector(name, help, "counter", fn, labels))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            samples = metric.samples()
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
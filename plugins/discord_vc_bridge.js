@@ -5,9 +5,92 @@ console.log("Discord VC Bridge Plugin geladen!");
 
 const BOT_API_URL = 'http://127.0.0.1:8081/update';
 const BOT_WS_URL = 'ws://127.0.0.1:8081/ws';
+const MAX_WS_BUFFERED = 256 * 1024;   // Bytes, die noch im Socket hängen dürfen
+const MAX_BOT_BACKLOG_MS = 1500;      // darüber verwirft der Bot ohnehin die ältesten Daten
+const OPUS_BITRATE = 128000;
+const OPUS_HEADER_SIZE = 9;           // Typ (1) + Sequenznummer (4) + Zeitstempel in 48kHz-Samples (4)
+const MAX_ENCODE_QUEUE = 8;
+const FRAME_SAMPLES = 960;            // 20ms bei 48kHz = WSAudioSource.CHUNK_SIZE (3840 Bytes s16 Stereo)
+
+// AudioWorklet: läuft im Audio-Thread, resampelt auf 48kHz, konvertiert und schickt
+// fertige 20ms-Frames als übertragbare Buffer (ohne Kopie) an den Hauptthread.
+const CAPTURE_WORKLET = `
+class InfernoBridgeCapture extends AudioWorkletProcessor {
+    constructor(options) {
+        super();
+        this.format = options.processorOptions.format;
+        this.volume = 1.0;
+        this.step = sampleRate / 48000;
+        this.pos = 0;
+        this.lastL = 0;
+        this.lastR = 0;
+        this.fill = 0;
+        this.newFrame();
+        this.port.onmessage = (e) => { if (e.data.volume !== undefined) this.volume = e.data.volume; };
+    }
+    newFrame() {
+        this.frame = this.format === 'opus'
+            ? new Float32Array(${FRAME_SAMPLES} * 2)
+            : new Int16Array(${FRAME_SAMPLES} * 2);
+    }
+    push(l, r) {
+        const gain = 1.2 * this.volume;
+        l = Math.max(-1, Math.min(1, l * gain));
+        r = Math.max(-1, Math.min(1, r * gain));
+        const i = this.fill++;
+        if (this.format === 'opus') {
+            this.frame[i] = l;
+            this.frame[${FRAME_SAMPLES} + i] = r;
+        } else {
+            this.frame[i * 2] = l < 0 ? l * 0x8000 : l * 0x7FFF;
+            this.frame[i * 2 + 1] = r < 0 ? r * 0x8000 : r * 0x7FFF;
+        }
+        if (this.fill === ${FRAME_SAMPLES}) {
+            this.port.postMessage(this.frame.buffer, [this.frame.buffer]);
+            this.fill = 0;
+            this.newFrame();
+        }
+    }
+    process(inputs) {
+        const input = inputs[0];
+        if (!input || input.length === 0) return true;
+        const left = input[0];
+        const right = input[1] || input[0];
+        if (this.step === 1) {
+            for (let i = 0; i < left.length; i++) this.push(left[i], right[i]);
+            return true;
+        }
+        // Lineare Interpolation; pos läuft relativ zum aktuellen Block, -1 = letztes Sample des Vorgängers
+        while (this.pos < left.length - 1) {
+            const i = Math.floor(this.pos);
+            const t = this.pos - i;
+            const l0 = i < 0 ? this.lastL : left[i], r0 = i < 0 ? this.lastR : right[i];
+            this.push(l0 + (left[i + 1] - l0) * t, r0 + (right[i + 1] - r0) * t);
+            this.pos += this.step;
+        }
+        this.pos -= left.length;
+        this.lastL = left[left.length - 1];
+        this.lastR = right[right.length - 1];
+        return true;
+    }
+}
+// nach reloadPlugins() läuft das Modul im selben AudioContext erneut; ein zweites
+// registerProcessor() würde mit NotSupportedError das ganze addModule() scheitern lassen
+try {
+    registerProcessor('inferno-bridge-capture', InfernoBridgeCapture);
+} catch (e) {}
+`;
 
 let ws = null;
 let processor = null;
+let captureEnabled = false;  // der Bot sagt uns über den Steuerkanal, ob jemand zuhört
+let botStatus = null;
+let droppedFrames = 0;
+let captureFormat = 'pcm';   // 'pcm' (roh) oder 'opus' (vorkodiert), vom Bot vorgegeben
+let encoder = null;
+let opusSeq = 0;             // laufen über Capture-Neustarts weiter, damit der Bot sauber sortieren kann
+let capturedFrames = 0;
+let captureNode = null;
 let botVolume = 1.0;
 let injectedUI = [];
 
@@ -80,6 +163,7 @@ setTimeout(() => {
     if (container) {
         document.getElementById('bot-vol-slider').addEventListener('input', (e) => {
             botVolume = parseFloat(e.target.value);
+            if (captureNode) captureNode.port.postMessage({ volume: botVolume });
         });
     }
 }, 1000);
@@ -88,19 +172,53 @@ function connectWebSocket() {
     ws = new WebSocket(BOT_WS_URL);
     ws.binaryType = 'arraybuffer';
     ws.onopen = () => console.log("Verbunden mit Discord Bot Audio-Stream!");
+    ws.onmessage = (e) => {
+        if (typeof e.data !== 'string') return;
+        let msg;
+        try { msg = JSON.parse(e.data); } catch (err) { return; }
+        handleControlMessage(msg);
+    };
     ws.onclose = () => {
+        setCaptureEnabled(false);
+        if (!ws) return; // Plugin wurde entladen
         console.log("Verbindung zum Bot verloren. Versuche Reconnect in 5s...");
         setTimeout(connectWebSocket, 5000);
     };
     ws.onerror = (err) => console.error("WS Error", err);
 }
 
+function handleControlMessage(msg) {
+    if (msg.type === 'capture') {
+        const format = msg.format === 'opus' ? 'opus' : 'pcm';
+        if (format !== captureFormat) {
+            stopAudioCapture();
+            captureFormat = format;
+            if (captureEnabled) startAudioCapture();
+        }
+        setCaptureEnabled(!!msg.enabled);
+    } else if (msg.type === 'status') {
+        botStatus = msg;
+    }
+}
+
+function setCaptureEnabled(enabled) {
+    if (enabled === captureEnabled) return;
+    captureEnabled = enabled;
+    botStatus = null;
+    if (enabled) {
+        console.log(`Bot ist im Voice Channel, starte Audio-Capture (${captureFormat}).`);
+        startAudioCapture();
+    } else {
+        stopAudioCapture();
+    }
+}
+
 connectWebSocket();
 
 window.InfernoPluginAPI.registerCleanup(() => {
     cleanupUI();
-    if (ws) { ws.close(); ws = null; }
-    if (processor) { processor.disconnect(); processor = null; }
+    if (ws) { const sock = ws; ws = null; sock.close(); }
+    stopAudioCapture();
 });
 
 function sendToDiscordBot(action, meta) {
@@ -114,37 +232,61 @@ function sendToDiscordBot(action, meta) {
 
 window.InfernoPluginAPI.on('onPlay', (meta) => {
     sendToDiscordBot('play', meta);
-    startAudioCapture();
+    if (captureEnabled) startAudioCapture();
 });
 
 window.InfernoPluginAPI.on('onTrackChange', (meta) => {
     sendToDiscordBot('play', meta);
-    startAudioCapture();
+    if (captureEnabled) startAudioCapture();
 });
 
 window.InfernoPluginAPI.on('onPause', () => {
     sendToDiscordBot('pause', window.InfernoPluginAPI.getCurrentMetadata());
 });
 
+function botBackpressure() {
+    return ws.bufferedAmount > MAX_WS_BUFFERED ||
+        (botStatus && botStatus.queue_ms > MAX_BOT_BACKLOG_MS) ||
+        (encoder && encoder.encodeQueueSize > MAX_ENCODE_QUEUE);
+}
+
 function startAudioCapture() {
-    if (processor) return;
+    if (processor || captureNode) return;
     const audioCtx = window.InfernoPluginAPI.getAudioContext();
     const analyser = window.InfernoPluginAPI.getAnalyser();
     if (!audioCtx || !analyser) return;
 
+    if (captureFormat === 'opus') {
+        encoder = createOpusEncoder(audioCtx.audioWorklet ? 48000 : audioCtx.sampleRate);
+        if (!encoder) return;
+    }
+
+    if (audioCtx.audioWorklet) {
+        startWorkletCapture(audioCtx, analyser);
+        return;
+    }
+    startScriptProcessorCapture(audioCtx, analyser);
+}
+
+// Fallback für WebViews ohne AudioWorklet (oder wenn addModule() scheitert): ScriptProcessor im UI-Thread
+function startScriptProcessorCapture(audioCtx, analyser) {
     processor = audioCtx.createScriptProcessor(16384, 2, 2);
     analyser.connect(processor);
     processor.connect(audioCtx.destination);
 
-    window.InfernoPluginAPI.registerCleanup(() => {
-        if (processor) {
-            try { processor.disconnect(); } catch(e) {}
-            processor = null;
-        }
-    });
-
     processor.onaudioprocess = (e) => {
+        const frameStart = capturedFrames;
+        capturedFrames += e.inputBuffer.length;
         if (!ws || ws.readyState !== WebSocket.OPEN) return;
+        // Backpressure: nicht konvertieren, wenn Socket oder Bot ohnehin hinterherhängen
+        if (botBackpressure()) {
+            droppedFrames++;
+            return;
+        }
+        if (encoder) {
+            encodeOpus(e.inputBuffer, frameStart);
+            return;
+        }
         const left = e.inputBuffer.getChannelData(0);
         const right = e.inputBuffer.getChannelData(1);
         const pcm = new Int16Array(left.length * 2);
@@ -159,3 +301,131 @@ function startAudioCapture() {
         ws.send(pcm.buffer);
     };
 }
+
+function startWorkletCapture(audioCtx, analyser) {
+    // Promise hängt am AudioContext statt am Plugin: überlebt reloadPlugins(), addModule() nur einmal pro Kontext
+    if (!audioCtx.__infernoCaptureReady) {
+        const url = URL.createObjectURL(new Blob([CAPTURE_WORKLET], { type: 'application/javascript' }));
+        audioCtx.__infernoCaptureReady = audioCtx.audioWorklet.addModule(url);
+    }
+    const format = captureFormat;
+    const pending = {};
+    captureNode = pending;
+    audioCtx.__infernoCaptureReady.then(() => {
+        if (captureNode !== pending || !captureEnabled) return;
+        const node = new AudioWorkletNode(audioCtx, 'inferno-bridge-capture', {
+            numberOfInputs: 1,
+            numberOfOutputs: 1,
+            outputChannelCount: [2],
+            processorOptions: { format: format }
+        });
+        node.port.postMessage({ volume: botVolume });
+        node.port.onmessage = (e) => {
+            const frameStart = capturedFrames;
+            capturedFrames += FRAME_SAMPLES;
+            if (!ws || ws.readyState !== WebSocket.OPEN) return;
+            if (botBackpressure()) {
+                droppedFrames++;
+                return;
+            }
+            if (encoder) {
+                encodeOpusFrame(new Float32Array(e.data), 48000, FRAME_SAMPLES, frameStart);
+            } else {
+                ws.send(e.data);
+            }
+        };
+        analyser.connect(node);
+        node.connect(audioCtx.destination);
+        captureNode = node;
+    }).catch((err) => {
+        console.error("AudioWorklet konnte nicht geladen werden, nutze ScriptProcessor", err);
+        if (captureNode !== pending) return;
+        captureNode = null;
+        if (!captureEnabled) return;
+        // der Encoder lief auf 48kHz (Worklet resampelt); der ScriptProcessor liefert audioCtx.sampleRate
+        if (encoder) {
+            try { encoder.close(); } catch(e) {}
+            encoder = createOpusEncoder(audioCtx.sampleRate);
+            if (!encoder) return;
+        }
+        startScriptProcessorCapture(audioCtx, analyser);
+    });
+}
+
+function createOpusEncoder(sampleRate) {
+    if (typeof AudioEncoder === 'undefined') {
+        console.error("Opus-Modus benötigt WebCodecs (AudioEncoder), wird von dieser WebView nicht unterstützt.");
+        return null;
+    }
+    const enc = new AudioEncoder({
+        output: sendOpusPacket,
+        error: (err) => console.error("Opus Encoder Fehler", err)
+    });
+    enc.configure({
+        codec: 'opus',
+        sampleRate: sampleRate,
+        numberOfChannels: 2,
+        bitrate: OPUS_BITRATE,
+        opus: { frameDuration: 20000 }
+    });
+    return enc;
+}
+
+function encodeOpus(inputBuffer, frameStart) {
+    const n = inputBuffer.length;
+    const planar = new Float32Array(n * 2);
+    for (let ch = 0; ch < 2; ch++) {
+        const src = inputBuffer.getChannelData(ch);
+        const offset = ch * n;
+        for (let i = 0; i < n; i++) {
+            planar[offset + i] = Math.max(-1, Math.min(1, src[i] * 1.2 * botVolume));
+        }
+    }
+    encodeOpusFrame(planar, inputBuffer.sampleRate, n, frameStart);
+}
+
+function encodeOpusFrame(planar, sampleRate, n, frameStart) {
+    const data = new AudioData({
+        format: 'f32-planar',
+        sampleRate: sampleRate,
+        numberOfFrames: n,
+        numberOfChannels: 2,
+        timestamp: Math.round(frameStart * 1e6 / sampleRate),
+        data: planar
+    });
+    encoder.encode(data);
+    data.close();
+}
+
+function sendOpusPacket(chunk) {
+    if (!ws || ws.readyState !== WebSocket.OPEN) return;
+    const packet = new Uint8Array(OPUS_HEADER_SIZE + chunk.byteLength);
+    const header = new DataView(packet.buffer);
+    header.setUint8(0, 1);
+    header.setUint32(1, opusSeq >>> 0);
+    header.setUint32(5, Math.round(chunk.timestamp * 48 / 1000) >>> 0);
+    chunk.copyTo(packet.subarray(OPUS_HEADER_SIZE));
+    opusSeq++;
+    ws.send(packet.buffer);
+}
+
+function stopAudioCapture() {
+    if (encoder) {
+        try { encoder.close(); } catch(e) {}
+        encoder = null;
+    }
+    const analyser = window.InfernoPluginAPI.getAnalyser();
+    if (captureNode) {
+        if (captureNode instanceof AudioWorkletNode) {
+            captureNode.port.onmessage = null;
+            try { if (analyser) analyser.disconnect(captureNode); } catch(e) {}
+            try { captureNode.disconnect(); } catch(e) {}
+        }
+        captureNode = null;
+    }
+    if (!processor) return;
+    processor.onaudioprocess = null;
+    try { if (analyser) analyser.disconnect(processor); } catch(e) {}
+    try { processor.disconnect(); } catch(e) {}
+    processor = null;
+}
@@ -0,0 +1,49 @@
+import contextlib
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import discord_vc_bot as bot
+
+
+def packet(seq, payload):
+    return bot.OpusAudioSource.HEADER.pack(bot.OpusAudioSource.KIND_OPUS, seq, seq * 960) + payload
+
+
+class OpusAudioSourceRestartTest(unittest.TestCase):
+    def read(self, source, n):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [source.read() for _ in range(n)]
+
+    def test_restart_soon_after_start_resyncs(self):
+        source = bot.OpusAudioSource()
+        for seq in range(20):
+            source.feed(packet(seq, b'old%d' % seq))
+        self.read(source, 15)
+
+        # Plugin neu geladen, noch innerhalb der ersten MAX_TARGET Frames: seq beginnt wieder bei 0
+        for seq in range(10):
+            source.feed(packet(seq, b'new%d' % seq))
+        frames = self.read(source, 10)
+
+        self.assertEqual(source.stats["late_packets"], 0)
+        self.assertEqual(source.stats["resyncs"], 1)
+        self.assertIn(b'new0', frames)
+        self.assertFalse(any(f.startswith(b'old') for f in frames))
+
+    def test_late_packet_is_still_dropped(self):
+        source = bot.OpusAudioSource()
+        for seq in range(20):
+            source.feed(packet(seq, b'p%d' % seq))
+        self.read(source, 15)
+        source.feed(packet(5, b'late'))
+        self.read(source, 1)
+        self.assertEqual(source.stats["late_packets"], 1)
+        self.assertEqual(source.stats["resyncs"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()